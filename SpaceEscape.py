@@ -1,1078 +1,3267 @@
-import pygame
-import random
-import os
-import json
-import math
-import time
-
-pygame.init()
-
-# ----------------------------------------------------------
-# CONFIG
-# ----------------------------------------------------------
-WIDTH, HEIGHT = 800, 600
-FPS = 60
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Space Escape - Alpha")
-clock = pygame.time.Clock()
-
-
-
-# ----------------------------------------------------------
-#                   ASSETS
-# ----------------------------------------------------------
-
-ASSETS = {
-    "player1": "player1.png",
-    "player2": "player2.png",
-    "bullet": "bullet.png",
-    "meteoro_normal": "meteoro_normal.png",
-    "meteoro_amarelo": "meteoro_amarelo.png",
-    "meteoro_verde": "meteoro_verde.png",
-    "meteoro_teleport": "meteoro_teleport.png",
-    "boss_sprite": "boss_sprite.png",
-    "boss_engine": "boss_engine.png",
-    "shield": "shield.png",
-    "bg_phase1": "bg_phase1.png",
-    "bg_phase2": "bg_phase2.png",
-    "bg_phase3": "bg_phase3.png",
-    "bg_phase4": "bg_phase4.png",
-    "bg_boss": "bg_boss.png"
-}
-
-AUDIO_ASSETS = {
-    "intro": "intro.mp3",
-    "shoot": "shoot.WAV",
-    "hit": "hit.WAV",
-    "powerup_life": "powerup_life.WAV",
-    "powerup_shot": "powerup_shot.WAV",
-    "powerup_tp": "powerup_teleport.WAV",
-    "point": "point.wav",
-    "bg_phase1": "bg_phase1.mp3",
-    "bg_phase2": "bg_phase2.mp3",
-    "bg_phase3": "bg_phase3.mp3",
-    "bg_phase4": "bg_phase4.mp3",
-    "bg_boss": "bg_boss.mp3"
-}
-
-# COLORS & FONTS
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-YELLOW = (255, 220, 0)
-RED = (255, 60, 60)
-GREEN = (60, 255, 100)
-BLUE = (60, 100, 255)
-
-font = pygame.font.Font(None, 36)
-big_font = pygame.font.Font(None, 48)
-
-# GAME CONFIG
-PHASE_TARGETS = {1: 50, 2: 75, 3: 100, 4: 125}
-MAX_PHASE = 5
-MAX_METEORS_BASE = 5
-MAX_METEORS_INCREMENT = 3
-METEOR_MAX_SPEED = 12
-BULLET_LIMIT = 9
-INVULN_DURATION = 2000
-TP_SHIELD_DURATION = 5000
-PHASE_START_DELAY = 3000
-PLAYER_START_LIVES = 5
-SAVE_FILE = "savegame.json"
-HIGHSCORE_FILE = "highscores.json"
-TOP_SCORES = 10
-
-BOSS_W = 256
-BOSS_H = 128
-ENGINE_FRAMES = 10
-
-# ----------------------------------------------------------
-# HELPERS: IMAGEM/SOM/FALLBACK
-# ----------------------------------------------------------
-def load_image(filename, fallback_color=(100,100,100,0), size=None):
-    if filename and os.path.exists(filename):
-        try:
-            img = pygame.image.load(filename).convert_alpha()
-            if size:
-                img = pygame.transform.scale(img, size)
-            return img
-        except Exception:
-            pass
-    w, h = size if size else (50,50)
-    surf = pygame.Surface((w,h), pygame.SRCALPHA)
-    surf.fill(fallback_color)
-    return surf
-
-def load_sound(filename):
-    if filename and os.path.exists(filename):
-        try:
-            return pygame.mixer.Sound(filename)
-        except Exception:
-            return None
-    return None
-
-# Load images
-IMAGES = {
-    "player1": load_image(ASSETS.get("player1",""), size=(80,60)),
-    "player2": load_image(ASSETS.get("player2",""), size=(80,60)),
-    "bullet": pygame.transform.scale(load_image(ASSETS.get("bullet","")), (24,24)),
-    "meteoro_normal": load_image(ASSETS.get("meteoro_normal",""), size=(40,40)),
-    "meteoro_amarelo": load_image(ASSETS.get("meteoro_amarelo",""), size=(40,40)),
-    "meteoro_verde": load_image(ASSETS.get("meteoro_verde",""), size=(40,40)),
-    "meteoro_teleport": load_image(ASSETS.get("meteoro_teleport",""), size=(40,40)),
-    "boss_sprite": load_image(ASSETS.get("boss_sprite","")),
-    "boss_engine": load_image(ASSETS.get("boss_engine","")),
-    "shield": load_image(ASSETS.get("shield",""), size=(90,90)),
-    "bg_phase1": load_image(ASSETS.get("bg_phase1",""), size=(WIDTH,HEIGHT)),
-    "bg_phase2": load_image(ASSETS.get("bg_phase2",""), size=(WIDTH,HEIGHT)),
-    "bg_phase3": load_image(ASSETS.get("bg_phase3",""), size=(WIDTH,HEIGHT)),
-    "bg_phase4": load_image(ASSETS.get("bg_phase4",""), size=(WIDTH,HEIGHT)),
-    "bg_boss": load_image(ASSETS.get("bg_boss",""), size=(WIDTH,HEIGHT))
-}
-
-SOUNDS = {k: load_sound(v) for k,v in AUDIO_ASSETS.items()}
-
-# ----------------------------------------------------------
-# CONTROLE MUSICAS
-# ----------------------------------------------------------
-def play_music_for_phase(phase):
-    key = None
-    if phase == 1: key = "bg_phase1"
-    elif phase == 2: key = "bg_phase2"
-    elif phase == 3: key = "bg_phase3"
-    elif phase == 4: key = "bg_phase4"
-    elif phase == 5: key = "bg_boss"
-    path = AUDIO_ASSETS.get(key,"")
-    if path and os.path.exists(path):
-        try:
-            pygame.mixer.music.load(path)
-            pygame.mixer.music.set_volume(0.3)
-            pygame.mixer.music.play(-1)
-        except Exception:
-            pass
-    else:
-        try:
-            pygame.mixer.music.stop()
-        except:
-            pass
-
-def play_intro_music():
-    path = AUDIO_ASSETS.get("intro","")
-    if path and os.path.exists(path):
-        try:
-            pygame.mixer.music.load(path)
-            pygame.mixer.music.set_volume(0.35)
-            pygame.mixer.music.play(-1)
-        except:
-            pass
-    else:
-        try:
-            pygame.mixer.music.stop()
-        except:
-            pass
-
-def stop_music():
-    try:
-        pygame.mixer.music.stop()
-    except:
-        pass
-
-# ----------------------------------------------------------
-# SAVE
-# ----------------------------------------------------------
-def clamp(n, a, b):
-    return max(a, min(b, n))
-
-def save_json(filepath, data):
-    try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
-    except Exception as e:
-        print("Erro ao salvar JSON:", e)
-        return False
-
-def load_json(filepath):
-    if not os.path.exists(filepath):
-        return None
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print("Erro ao ler JSON:", e)
-        return None
-
-# ----------------------------------------------------------
-# SPRITESHEET
-# ----------------------------------------------------------
-class SpriteAnimation:
-    def __init__(self, spritesheet_surf, frame_w, frame_h, frame_time=100, frames_count=None):
-        self.frames = []
-        self.frame_w = frame_w
-        self.frame_h = frame_h
-        self.frame_time = frame_time
-        self.last_update = pygame.time.get_ticks()
-        self.current_frame = 0
-
-        if spritesheet_surf:
-            sheet_w = spritesheet_surf.get_width()
-            total = frames_count if frames_count else max(1, sheet_w // frame_w)
-            for i in range(total):
-                rect = pygame.Rect(i * frame_w, 0, frame_w, frame_h)
-                try:
-                    frame = spritesheet_surf.subsurface(rect).copy()
-                except Exception:
-                    frame = pygame.Surface((frame_w, frame_h), pygame.SRCALPHA)
-                self.frames.append(frame)
-
-    def update(self):
-        if len(self.frames) <= 1:
-            return
-        now = pygame.time.get_ticks()
-        if now - self.last_update >= self.frame_time:
-            self.last_update = now
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-
-    def get_frame(self):
-        if not self.frames:
-            return None
-        return self.frames[self.current_frame]
-
-# ----------------------------------------------------------
-# CLASSES: Projectile, Player, Meteor, Boss
-# ----------------------------------------------------------
-
-class Powerup:
-    def __init__(self, x, y, image_key, speed=3):
-        self.rect = pygame.Rect(int(x), int(y), 40, 40)
-        self.image = IMAGES.get(image_key)
-        self.speed = speed
-
-    def update(self):
-        self.rect.y += self.speed
-
-    def draw(self, surf):
-        if self.image:
-            surf.blit(self.image, self.rect)
-        else:
-            pygame.draw.rect(surf, YELLOW, self.rect)
-
-class PowerupLife(Powerup):
-    def __init__(self, x, y):
-        super().__init__(x, y, "meteoro_verde", speed=3)
-
-class PowerupShot(Powerup):
-    def __init__(self, x, y):
-        super().__init__(x, y, "meteoro_amarelo", speed=3)
-
-class PowerupTeleport(Powerup):
-    def __init__(self, x, y):
-        super().__init__(x, y, "meteoro_teleport", speed=3)
-
-class Projectile:
-    def __init__(self, x, y, vx, vy, owner, speed=12):
-        self.rect = pygame.Rect(int(x), int(y), 6, 12)
-        self.vx = vx
-        self.vy = vy
-        self.owner = owner
-        self.speed = speed
-
-    def update(self):
-        self.rect.x += int(self.vx)
-        self.rect.y += int(self.vy)
-
-    def draw(self, surf):
-        try:
-            surf.blit(IMAGES["bullet"], self.rect)
-        except:
-            pygame.draw.rect(surf, YELLOW, self.rect)
-
-class Player:
-    def __init__(self, number, x, y):
-        self.number = number
-        self.image = IMAGES["player1"] if number == 1 else IMAGES["player2"]
-        self.rect = self.image.get_rect(center=(x,y))
-        self.speed = 7
-        self.lives = PLAYER_START_LIVES
-        self.invulnerable_until = 0
-        self.shot_level = 1
-        self.bullets = []
-        self.max_bullets = BULLET_LIMIT
-        self.width = self.rect.width
-        self.height = self.rect.height
-
-    def can_shoot(self):
-        return len(self.bullets) < self.max_bullets
-
-    def take_damage(self):
-        now = pygame.time.get_ticks()
-        if now < self.invulnerable_until:
-            return False
-        self.lives -= 1
-        self.invulnerable_until = now + INVULN_DURATION
-        if SOUNDS.get("hit"):
-            try:
-                SOUNDS["hit"].play()
-            except:
-                pass
-        return True
-
-    def draw(self, surf):
-        now = pygame.time.get_ticks()
-        if now < self.invulnerable_until:
-            if (now // 120) % 2 == 0:
-                return
-        surf.blit(self.image, self.rect)
-
-class Meteor:
-    def __init__(self, x, y, w=40, h=40, typ="normal", speed=4):
-        self.rect = pygame.Rect(int(x), int(y), w, h)
-        self.type = typ
-        self.speed = speed
-        self.image = IMAGES.get("meteoro_normal")
-
-    def update(self):
-        self.rect.y += self.speed
-
-    def draw(self, surf):
-        if self.image:
-            surf.blit(self.image, self.rect)
-        else:
-            pygame.draw.rect(surf, RED, self.rect)
-
-class Boss:
-    def __init__(self, center_x, center_y):
-        self.w, self.h = BOSS_W, BOSS_H
-        raw = IMAGES.get("boss_sprite")
-        self.sprite = pygame.transform.scale(raw, (self.w, self.h)) if raw else None
-        self.rect = pygame.Rect(center_x - self.w//2, center_y - self.h//2, self.w, self.h)
-
-        self.hp_left = 100
-        self.hp_core = 300
-        self.hp_right = 100
-        self.max_left = 100
-        self.max_core = 300
-        self.max_right = 100
-
-        self.projectiles = []
-        self.shoot_delay = 1200
-        self.last_shot = pygame.time.get_ticks()
-
-        # ANIMAÇÃO DOS MOTORES
-        sheet = IMAGES.get("boss_engine")
-        if sheet and sheet.get_width() > 0 and sheet.get_height() > 0:
-            orig_w = sheet.get_width()
-            orig_h = sheet.get_height()
-            frames_count = max(2, orig_w // max(1, orig_h))
-            frame_w = orig_w // frames_count
-
-            scaled_sheet = pygame.Surface((self.w * frames_count, self.h), pygame.SRCALPHA)
-            for i in range(frames_count):
-                try:
-                    src_rect = pygame.Rect(i * frame_w, 0, frame_w, orig_h)
-                    frame = sheet.subsurface(src_rect)
-                    scaled = pygame.transform.scale(frame, (self.w, self.h))
-                    scaled_sheet.blit(scaled, (i * self.w, 0))
-                except:
-                    pass
-            self.engine_anim = SpriteAnimation(scaled_sheet, self.w, self.h, frame_time=90, frames_count=frames_count)
-        else:
-            self.engine_anim = None
-
-        self.engine_offset_y = self.h // 2 + 25
-
-    def total_hp(self): return max(0,self.hp_left) + max(0,self.hp_core) + max(0,self.hp_right)
-    def max_total_hp(self): return self.max_left + self.max_core + self.max_right
-    def is_defeated(self): return self.total_hp() <= 0
-
-    def take_damage_to_part(self, part, dmg):
-        if part == "left": self.hp_left = max(0, self.hp_left - dmg)
-        elif part == "core": self.hp_core = max(0, self.hp_core - dmg)
-        elif part == "right": self.hp_right = max(0, self.hp_right - dmg)
-
-    def update(self, players):
-        if self.engine_anim: self.engine_anim.update()
-        now = pygame.time.get_ticks()
-        if now - self.last_shot > self.shoot_delay:
-            targets = [p for p in players if p and p.lives > 0]
-            if targets:
-                alive = []
-                if self.hp_left > 0: alive.append("left")
-                if self.hp_core > 0: alive.append("core")
-                if self.hp_right > 0: alive.append("right")
-                if alive:
-                    part = random.choice(alive)
-                    offset = -self.w//3 if part == "left" else self.w//3 if part == "right" else 0
-                    shooter_x = self.rect.centerx + offset
-                    target = random.choice(targets)
-                    dx = target.rect.centerx - shooter_x
-                    dy = target.rect.centery - self.rect.centery
-                    dist = math.hypot(dx, dy) or 1
-                    speed = 4.5
-                    proj = Projectile(shooter_x, self.rect.centery, dx/dist*speed, dy/dist*speed, "boss")
-                    self.projectiles.append(proj)
-            self.last_shot = now
-
-        for p in list(self.projectiles):
-            p.update()
-            if not (0 <= p.rect.centerx <= WIDTH and 0 <= p.rect.centery <= HEIGHT):
-                self.projectiles.remove(p)
-
-    def draw(self, surf):
-        if self.sprite:
-            surf.blit(self.sprite, self.rect)
-        else:
-            pygame.draw.rect(surf, (180,180,180), self.rect)
-
-        if self.engine_anim:
-            frame = self.engine_anim.get_frame()
-            if frame:
-                r = frame.get_rect(center=(self.rect.centerx, self.rect.centery + self.engine_offset_y))
-                surf.blit(frame, r)
-
-        total, max_t = self.total_hp(), self.max_total_hp()
-        bar_w, bar_h = 340, 16
-        x = self.rect.centerx - bar_w//2
-        y = self.rect.top - 40
-        pygame.draw.rect(surf, (80,0,0), (x, y, bar_w, bar_h))
-        if max_t > 0:
-            pygame.draw.rect(surf, (0,255,0), (x, y, int(bar_w * total / max_t), bar_h))
-
-        for proj in self.projectiles:
-            pygame.draw.circle(surf, (255,80,80), proj.rect.center, 9)
-# ----------------------------------------------------------
-# UI / HUD
-# ----------------------------------------------------------
-def draw_text_center(text, y, size=36, color=WHITE):
-    f = pygame.font.Font(None, size)
-    surf = f.render(text, True, color)
-    rect = surf.get_rect(center=(WIDTH//2, y))
-    screen.blit(surf, rect)
-
-def draw_hud(players, phase_score, phase, phase_target, credits=0):
-    y = 8
-    for p in players:
-        if p:
-            text = f"P{p.number} Vidas:{p.lives} Tiros:{p.shot_level} BalasTela:{len(p.bullets)}"
-            surf = font.render(text, True, WHITE)
-            screen.blit(surf, (10, y))
-            y += 24
-    info = f"Fase: {phase}"
-    surf = font.render(info, True, WHITE)
-    screen.blit(surf, (WIDTH - 150, 8))
-    target_text = f"Pontos: {phase_score} / {phase_target if phase < 5 else 'BOSS'}"
-    surf2 = font.render(target_text, True, WHITE)
-    screen.blit(surf2, (WIDTH - 320, 35))
-    credit_text = f"CREDIT(S): {credits}"
-    surf3 = font.render(credit_text, True, WHITE)
-    screen.blit(surf3, (WIDTH//2 - 60, HEIGHT - 30))
-
-# ----------------------------------------------------------
-# SPAWN DE METEOROS E POWERUPS
-# ----------------------------------------------------------
-def spawn_meteors_for_phase(phase):
-    max_count = MAX_METEORS_BASE + (phase - 1) * MAX_METEORS_INCREMENT
-    lst = []
-    for _ in range(max_count):
-        x = random.randint(0, WIDTH - 40)
-        y = random.randint(-500, -40)
-        speed = random.randint(3 + (phase - 1), min(METEOR_MAX_SPEED, 5 + (phase - 1) * 2))
-        meteor = Meteor(x, y, 40, 40, typ="normal", speed=speed)
-        lst.append(meteor)
-    return lst
-
-def spawn_powerups_for_phase(phase):
-    lst = []
-    base_count = 3 + phase
-    extra = random.randint(3, 8)
-    for _ in range(base_count + extra):
-        x = random.randint(0, WIDTH - 40)
-        y = random.randint(-1200, -100)
-        r = random.random()
-        if r < 0.35:
-            lst.append(PowerupLife(x, y))
-        elif r < 0.70:
-            lst.append(PowerupShot(x, y))
-        else:
-            lst.append(PowerupTeleport(x, y))
-    return lst
-
-# ----------------------------------------------------------
-# SAVE/LOAD/HIGHSCORES
-# ----------------------------------------------------------
-def make_save_state(phase, phase_score, players, meteors, powerups, boss, phase_timer_start, player2_active, mouse_control):
-    state = {
-        "phase": phase,
-        "phase_score": phase_score,
-        "player2_active": player2_active,
-        "mouse_control": mouse_control,
-        "phase_timer_start": phase_timer_start,
-        "players": [],
-        "meteors": [],
-        "powerups": [],
-        "boss": None
-    }
-    for p in players:
-        if p:
-            pl = {
-                "number": p.number,
-                "x": p.rect.x,
-                "y": p.rect.y,
-                "lives": p.lives,
-                "shot_level": p.shot_level,
-                "inv_rem": max(0, p.invulnerable_until - pygame.time.get_ticks())
-            }
-            state["players"].append(pl)
-    for m in meteors:
-        state["meteors"].append({"x": m.rect.x, "y": m.rect.y, "speed": m.speed})
-    for pu in powerups:
-        typ = "life" if isinstance(pu, PowerupLife) else "shot" if isinstance(pu, PowerupShot) else "tp"
-        state["powerups"].append({"x": pu.rect.x, "y": pu.rect.y, "type": typ})
-    if boss:
-        state["boss"] = {
-            "hp_left": boss.hp_left,
-            "hp_core": boss.hp_core,
-            "hp_right": boss.hp_right
-        }
-    return state
-
-def restore_save_state(s):
-    phase = s.get("phase", 1)
-    phase_score = s.get("phase_score", 0)
-    player_objs = [None, None]
-    for pd in s.get("players", []):
-        num = pd.get("number", 1)
-        p = Player(num, pd.get("x", WIDTH//2), pd.get("y", HEIGHT-60))
-        p.lives = pd.get("lives", PLAYER_START_LIVES)
-        p.shot_level = pd.get("shot_level", 1)
-        inv_rem = pd.get("inv_rem", 0)
-        if inv_rem > 0:
-            p.invulnerable_until = pygame.time.get_ticks() + inv_rem
-        player_objs[num-1] = p
-    meteors = []
-    for md in s.get("meteors", []):
-        m = Meteor(md.get("x",0), md.get("y",-50), 40, 40, typ="normal", speed=md.get("speed",4))
-        meteors.append(m)
-    powerups = []
-    for pud in s.get("powerups", []):
-        x, y = pud.get("x",0), pud.get("y",-100)
-        typ = pud.get("type","life")
-        if typ == "life": powerups.append(PowerupLife(x,y))
-        elif typ == "shot": powerups.append(PowerupShot(x,y))
-        else: powerups.append(PowerupTeleport(x,y))
-    boss = None
-    if s.get("boss"):
-        boss = Boss(WIDTH//2, HEIGHT//3)
-        boss.hp_left = s["boss"].get("hp_left", boss.max_left)
-        boss.hp_core = s["boss"].get("hp_core", boss.max_core)
-        boss.hp_right = s["boss"].get("hp_right", boss.max_right)
-    return phase, phase_score, player_objs, meteors, powerups, boss, s.get("phase_timer_start", None), s.get("player2_active", False), s.get("mouse_control", False)
-
-def load_highscores():
-    data = load_json(HIGHSCORE_FILE)
-    if not data:
-        return []
-    return data
-
-def save_highscores(lst):
-    save_json(HIGHSCORE_FILE, lst)
-
-def add_highscore(name, score):
-    scores = load_highscores()
-    scores.append({"name": name, "score": score})
-    scores = sorted(scores, key=lambda s: s["score"], reverse=True)[:TOP_SCORES]
-    save_highscores(scores)
-
-# ----------------------------------------------------------
-# EXIT/MENU
-# ----------------------------------------------------------
-def confirm_quit_sequence():
-    while True:
-        screen.fill((10,10,20))
-        draw_text_center("Pressione ESC para confirmar saída, ou qualquer outra tecla para cancelar.", HEIGHT//2, size=24)
-        pygame.display.flip()
-        for ev in pygame.event.get():
-            if ev.type == pygame.QUIT:
-                return False
-            if ev.type == pygame.KEYDOWN:
-                if ev.key == pygame.K_ESCAPE:
-                    return True
-                else:
-                    return False
-        clock.tick(FPS)
-
-def start_menu():
-    credits = 0
-    show_highscores = False
-    enable_player2 = False
-    mouse_control = False
-    scores = load_highscores()
-
-    play_intro_music()
-
-    while True:
-        screen.fill((18,18,30))
-        draw_text_center("SPACE ESCAPE", HEIGHT//4, size=64)
-        draw_text_center("Pressione C para inserir ficha (Insert Coin).", HEIGHT//4 + 60, size=24)
-        draw_text_center("Pressione ENTER para iniciar (requer 1 ficha).", HEIGHT//4 + 90, size=22)
-        draw_text_center("Pressione H para ver High Scores. M ativa mouse para P1. 2 ativa P2.", HEIGHT//4 + 120, size=20)
-        draw_text_center("Pressione L para carregar jogo salvo. Pressione Q para sair.", HEIGHT//4 + 150, size=20)
-
-        credit_surf = font.render(f"CREDIT(S): {credits}", True, WHITE)
-        screen.blit(credit_surf, (WIDTH//2 - 60, HEIGHT//2 + 80))
-
-        if show_highscores:
-            y = HEIGHT//2 - 20
-            draw_text_center("Top Scores:", y, size=32)
-            y += 40
-            for s in scores[:TOP_SCORES]:
-                surf = font.render(f"{s['name']} - {s['score']}", True, WHITE)
-                screen.blit(surf, (WIDTH//2 - 100, y))
-                y += 24
-
-        pygame.display.flip()
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                stop_music()
-                if confirm_quit_sequence():
-                    pygame.quit()
-                    raise SystemExit
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_c:
-                    credits += 1
-                if event.key == pygame.K_h:
-                    show_highscores = not show_highscores
-                if event.key == pygame.K_2:
-                    enable_player2 = not enable_player2
-                if event.key == pygame.K_m:
-                    mouse_control = not mouse_control
-                if event.key == pygame.K_l:
-                    stop_music()
-                    return {"start": True, "player2": enable_player2, "mouse": mouse_control, "load": True, "credits": credits}
-                if event.key == pygame.K_q:
-                    stop_music()
-                    if confirm_quit_sequence():
-                        pygame.quit()
-                        raise SystemExit
-                if event.key == pygame.K_RETURN:
-                    if credits >= 1:
-                        credits -= 1
-                        stop_music()
-                        return {"start": True, "player2": enable_player2, "mouse": mouse_control, "load": False, "credits": credits}
-                    else:
-                        try:
-                            if SOUNDS.get("hit"):
-                                SOUNDS["hit"].play()
-                        except:
-                            pass
-        clock.tick(FPS)
-
-def end_screen(win, phase_score):
-    try:
-        pygame.mixer.music.stop()
-    except:
-        pass
-    name = ""
-    entering = True
-    while entering:
-        screen.fill((10,10,20))
-        if win:
-            draw_text_center("Você venceu! Parabéns!", HEIGHT//3, size=48)
-        else:
-            draw_text_center("Fim de jogo!", HEIGHT//3, size=48)
-        draw_text_center(f"Pontuação final: {phase_score}", HEIGHT//3 + 60, size=32)
-        draw_text_center("Digite seu nome e pressione ENTER para salvar no High Score:", HEIGHT//3 + 120, size=20)
-        name_surf = font.render(name, True, WHITE)
-        screen.blit(name_surf, (WIDTH//2 - 100, HEIGHT//3 + 160))
-        pygame.display.flip()
-        for ev in pygame.event.get():
-            if ev.type == pygame.QUIT:
-                if confirm_quit_sequence():
-                    pygame.quit()
-                    raise SystemExit
-            if ev.type == pygame.KEYDOWN:
-                if ev.key == pygame.K_RETURN:
-                    if name.strip() == "":
-                        name = "ANÔNIMO"
-                    add_highscore(name, phase_score)
-                    entering = False
-                    break
-                elif ev.key == pygame.K_BACKSPACE:
-                    name = name[:-1]
-                else:
-                    if len(name) < 16 and ev.unicode.isprintable():
-                        name += ev.unicode
-    showing = True
-    while showing:
-        screen.fill((10,10,20))
-        draw_text_center("Jogo encerrado.", HEIGHT//2 - 40)
-        draw_text_center("Pressione C para voltar ao menu inicial ou Q para sair.", HEIGHT//2 + 10)
-        pygame.display.flip()
-        for ev in pygame.event.get():
-            if ev.type == pygame.QUIT:
-                if confirm_quit_sequence():
-                    pygame.quit()
-                    raise SystemExit
-            if ev.type == pygame.KEYDOWN:
-                if ev.key019 == pygame.K_c:
-                    showing = False
-                    return
-                if ev.key == pygame.K_q:
-                    if confirm_quit_sequence():
-                        pygame.quit()
-                        raise SystemExit
-
-# ----------------------------------------------------------
-# GAME LOOP
-# ----------------------------------------------------------
-def game_loop(start_args):
-    phase = 1
-    phase_score = 0
-    phase_target = PHASE_TARGETS.get(phase, None)
-    meteors = spawn_meteors_for_phase(phase)
-    powerups = spawn_powerups_for_phase(phase)
-    boss = None
-    players = [None, None]
-    players[0] = Player(1, WIDTH//2, HEIGHT-80)
-    if start_args.get("player2"):
-        players[1] = Player(2, WIDTH//2 - 120, HEIGHT-80)
-    mouse_control = start_args.get("mouse", False)
-    player2_active = bool(start_args.get("player2", False))
-    phase_start_time = pygame.time.get_ticks()
-    in_phase_countdown = True
-    countdown_start = pygame.time.get_ticks()
-    stop_music()
-    play_music_for_phase(phase)
-    running = True
-    paused = False
-    credits_remaining = start_args.get("credits", 0)
-
-    while running:
-        dt = clock.tick(FPS)
-        now = pygame.time.get_ticks()
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                if confirm_quit_sequence():
-                    pygame.quit()
-                    raise SystemExit
-
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_p:
-                    paused = not paused
-                if event.key == pygame.K_F1:
-                    state = make_save_state(phase, phase_score, players, meteors, powerups, boss, phase_start_time, player2_active, mouse_control)
-                    save_json(SAVE_FILE, state)
-                if event.key == pygame.K_F2:
-                    s = load_json(SAVE_FILE)
-                    if s:
-                        phase, phase_score, restored_players, meteors, powerups, boss, pst, player2_active, mouse_control = restore_save_state(s)
-                        if restored_players[0]: players[0] = restored_players[0]
-                        if len(restored_players) > 1 and restored_players[1]: players[1] = restored_players[1]
-                        phase_start_time = pygame.time.get_ticks()
-                        in_phase_countdown = True
-                        countdown_start = pygame.time.get_ticks()
-                        play_music_for_phase(phase)
-                if event.key == pygame.K_2:
-                    if not players[1]:
-                        players[1] = Player(2, WIDTH//2 - 120, HEIGHT-80)
-                        player2_active = True
-                if event.key == pygame.K_m:
-                    mouse_control = not mouse_control
-                if event.key == pygame.K_ESCAPE:
-                    if confirm_quit_sequence():
-                        pygame.quit()
-                        raise SystemExit
-
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1 and mouse_control and players[0]:
-                    p1 = players[0]
-                    if p1.can_shoot():
-                        spacing = int(p1.width * 0.55)
-                        levels = p1.shot_level
-                        offsets = []
-                        if levels == 1:
-                            offsets = [0]
-                        elif levels == 2:
-                            offsets = [-spacing//2, spacing//2]
-                        else:
-                            offsets = [-spacing, 0, spacing]
-                        for off in offsets:
-                            bullet_w = IMAGES["bullet"].get_width()
-                            bullet_h = IMAGES["bullet"].get_height()
-                            ship_center = p1.rect.centerx
-                            ship_top = p1.rect.top
-                            bx = ship_center - bullet_w//2 + off
-                            by = ship_top - bullet_h//2
-                            proj = Projectile(bx, by, 0, -12, 1)
-                            p1.bullets.append(proj)
-                            if SOUNDS.get("shoot"):
-                                try:
-                                    SOUNDS["shoot"].play()
-                                except:
-                                    pass
-
-        if paused:
-            draw_text_center("PAUSADO - pressione P para continuar", HEIGHT//2)
-            pygame.display.flip()
-            continue
-
-        if in_phase_countdown:
-            elapsed = now - countdown_start
-            screen.fill((10,10,30))
-            seconds_left = max(0, PHASE_START_DELAY - elapsed)
-            if seconds_left > 0:
-                sleft = int(math.ceil(seconds_left / 1000.0))
-                draw_text_center(f"Prontos? {sleft}", HEIGHT//2, size=64)
-                pygame.display.flip()
-            else:
-                in_phase_countdown = False
-            if in_phase_countdown:
-                continue
-
-        keys = pygame.key.get_pressed()
-
-        #PLAYER 1
-        p1 = players[0]
-        if p1:
-            if mouse_control:
-                mx, my = pygame.mouse.get_pos()
-                p1.rect.centerx = clamp(mx, p1.rect.width//2, WIDTH - p1.rect.width//2)
-                p1.rect.centery = clamp(my, p1.rect.height//2, HEIGHT - p1.rect.height//2)
-            else:
-                if keys[pygame.K_LEFT] and p1.rect.left > 0:
-                    p1.rect.x -= p1.speed
-                if keys[pygame.K_RIGHT] and p1.rect.right < WIDTH:
-                    p1.rect.x += p1.speed
-                if keys[pygame.K_UP] and p1.rect.top > 0:
-                    p1.rect.y -= p1.speed
-                if keys[pygame.K_DOWN] and p1.rect.bottom < HEIGHT:
-                    p1.rect.y += p1.speed
-                if keys[pygame.K_SPACE]:
-                    if p1.can_shoot():
-                        spacing = int(p1.width * 0.55)
-                        levels = p1.shot_level
-                        offsets = []
-                        if levels == 1: offsets = [0]
-                        elif levels == 2: offsets = [-spacing//2, spacing//2]
-                        else: offsets = [-spacing, 0, spacing]
-                        for off in offsets:
-                            bullet_w = IMAGES["bullet"].get_width()
-                            bullet_h = IMAGES["bullet"].get_height()
-                            ship_center = p1.rect.centerx
-                            ship_top = p1.rect.top
-                            bx = ship_center - bullet_w//2 + off
-                            by = ship_top - bullet_h//2
-                            proj = Projectile(bx, by, 0, -12, 1)
-                            p1.bullets.append(proj)
-                            if SOUNDS.get("shoot"):
-                                try: SOUNDS["shoot"].play()
-                                except: pass
-
-        #PLAYER 2
-        p2 = players[1]
-        if p2:
-            if keys[pygame.K_a] and p2.rect.left > 0: p2.rect.x -= p2.speed
-            if keys[pygame.K_d] and p2.rect.right < WIDTH: p2.rect.x += p2.speed
-            if keys[pygame.K_w] and p2.rect.top > 0: p2.rect.y -= p2.speed
-            if keys[pygame.K_s] and p2.rect.bottom < HEIGHT: p2.rect.y += p2.speed
-            if keys[pygame.K_LCTRL] or keys[pygame.K_RCTRL]:
-                if p2.can_shoot():
-                    spacing = int(p2.width * 0.55)
-                    levels = p2.shot_level
-                    offsets = []
-                    if levels == 1: offsets = [0]
-                    elif levels == 2: offsets = [-spacing//2, spacing//2]
-                    else: offsets = [-spacing, 0, spacing]
-                    for off in offsets:
-                        bullet_w = IMAGES["bullet"].get_width()
-                        bullet_h = IMAGES["bullet"].get_height()
-                        ship_center = p2.rect.centerx
-                        ship_top = p2.rect.top
-                        bx = ship_center - bullet_w//2 + off
-                        by = ship_top - bullet_h//2
-                        proj = Projectile(bx, by, 0, -12, 2)
-                        p2.bullets.append(proj)
-                        if SOUNDS.get("shoot"):
-                            try: SOUNDS["shoot"].play()
-                            except: pass
-
-        for p in players:
-            if p:
-                for b in list(p.bullets):
-                    b.update()
-                    if b.rect.bottom < 0 or b.rect.top > HEIGHT or b.rect.left > WIDTH or b.rect.right < 0:
-                        try: p.bullets.remove(b)
-                        except: pass
-
-        #METEOROS
-        for m in list(meteors):
-            m.update()
-            if m.rect.top > HEIGHT:
-                m.rect.y = random.randint(-200, -40)
-                m.rect.x = random.randint(0, WIDTH - m.rect.width)
-                m.speed = random.randint(3 + (phase - 1), min(METEOR_MAX_SPEED, 5 + (phase - 1) * 2))
-
-            for p in players:
-                if p and m.rect.colliderect(p.rect):
-                    if p.take_damage():
-                        m.rect.y = random.randint(-200, -40)
-                        m.rect.x = random.randint(0, WIDTH - m.rect.width)
-
-            for p in players:
-                if p:
-                    for b in list(p.bullets):
-                        if m.rect.colliderect(b.rect):
-                            if SOUNDS.get("point"):
-                                try: SOUNDS["point"].play()
-                                except: pass
-                            try: p.bullets.remove(b)
-                            except: pass
-                            m.rect.y = random.randint(-200, -40)
-                            m.rect.x = random.randint(0, WIDTH - m.rect.width)
-                            phase_score += 2
-                            break
-
-        #POWERUPS
-        for pu in list(powerups):
-            pu.update()
-            if pu.rect.top > HEIGHT:
-                powerups.remove(pu)
-                continue
-
-            for p in players:
-                if p and pu.rect.colliderect(p.rect):
-                    if isinstance(pu, PowerupLife):
-                        p.lives += 1
-                        if SOUNDS.get("powerup_life"): SOUNDS["powerup_life"].play()
-                    elif isinstance(pu, PowerupShot):
-                        p.shot_level = clamp(p.shot_level + 1, 1, 3)
-                        if SOUNDS.get("powerup_shot"): SOUNDS["powerup_shot"].play()
-                    elif isinstance(pu, PowerupTeleport):
-                        p.rect.centerx = WIDTH//2
-                        p.rect.centery = HEIGHT - 120
-                        p.invulnerable_until = pygame.time.get_ticks() + TP_SHIELD_DURATION
-                        if SOUNDS.get("powerup_tp"): SOUNDS["powerup_tp"].play()
-                    try: powerups.remove(pu)
-                    except: pass
-                    newm = Meteor(random.randint(0, WIDTH-40), random.randint(-300,-40),
-                                  typ="normal",
-                                  speed=random.randint(3 + (phase - 1), min(METEOR_MAX_SPEED, 5 + (phase - 1) * 2)))
-                    meteors.append(newm)
-                    break
-
-        #BOSS
-        if phase == 5:
-            if boss is not None:
-                meteors = []
-                powerups = []
-            if not boss:
-                boss = Boss(WIDTH//2, HEIGHT//3)
-            boss.update(players)
-
-            for proj in list(boss.projectiles):
-                for p in players:
-                    if p and proj.rect.colliderect(p.rect):
-                        if p.take_damage():
-                            if SOUNDS.get("hit"): SOUNDS["hit"].play()
-                        try: boss.projectiles.remove(proj)
-                        except: pass
-
-            for p in players:
-                if p:
-                    for b in list(p.bullets):
-                        if boss.rect.colliderect(b.rect):
-                            rel_x = b.rect.centerx - boss.rect.left
-                            third = boss.rect.width / 3.0
-                            if rel_x < third:
-                                boss.take_damage_to_part("left", 10)
-                            elif rel_x < 2*third:
-                                boss.take_damage_to_part("core", 10)
-                            else:
-                                boss.take_damage_to_part("right", 10)
-                            phase_score += 10
-                            try: p.bullets.remove(b)
-                            except: pass
-
-            if boss.is_defeated():
-                end_screen(win=True, phase_score=phase_score + sum([p.lives * 5 for p in players if p]))
-                return
-
-        #INCREMENTO FASES
-        if phase < 5:
-            if phase_score >= PHASE_TARGETS[phase]:
-                phase += 1
-                phase_score = 0
-                if phase == 5:
-                    meteors = []
-                    powerups = []
-                else:
-                    meteors = spawn_meteors_for_phase(phase)
-                    powerups = spawn_powerups_for_phase(phase)
-                in_phase_countdown = True
-                countdown_start = pygame.time.get_ticks()
-                play_music_for_phase(phase)
-                continue
-
-        active_players = [p for p in players if p and p.lives > 0]
-        if not active_players:
-            end_screen(win=False, phase_score=phase_score)
-            return
-
-        # DESENHOS
-        bg_key = {1:"bg_phase1",2:"bg_phase2",3:"bg_phase3",4:"bg_phase4",5:"bg_boss"}.get(phase)
-        screen.fill((5,5,20))
-        if bg_key and os.path.exists(ASSETS.get(bg_key,"")):
-            try: screen.blit(IMAGES[bg_key], (0,0))
-            except: pass
-
-        for m in meteors: m.draw(screen)
-        for pu in powerups: pu.draw(screen)
-
-        for p in players:
-            if p:
-                p.draw(screen)
-                if p.invulnerable_until > pygame.time.get_ticks():
-                    try:
-                        shield_img = IMAGES["shield"]
-                        extra = 24
-                        shield_scaled = pygame.transform.scale(shield_img, (p.rect.width + extra, p.rect.height + extra))
-                        shield_rect = shield_scaled.get_rect(center=p.rect.center)
-                        screen.blit(shield_scaled, shield_rect)
-                    except:
-                        pygame.draw.circle(screen, (100,200,255), p.rect.center, max(p.rect.width,p.rect.height)//2 + 8, 3)
-
-        for p in players:
-            if p:
-                for b in p.bullets:
-                    b.draw(screen)
-
-        if boss: boss.draw(screen)
-        draw_hud(players, phase_score, phase, PHASE_TARGETS.get(phase, None) or "BOSS", start_args.get("credits", 0))
-
-        pygame.display.flip()
-
-# ----------------------------------------------------------
-# MAIN
-# ----------------------------------------------------------
-def main():
-    try:
-        args = start_menu()
-        if not args:
-            return
-        if args.get("load"):
-            s = load_json(SAVE_FILE)
-            if s:
-                phase, phase_score, players, meteors, powerups, boss, pst, player2_active, mouse_control = restore_save_state(s)
-                game_loop({"player2": player2_active, "mouse": mouse_control, "credits": args.get("credits", 0)})
-            else:
-                game_loop(args)
-        else:
-            game_loop({"player2": args.get("player2", False), "mouse": args.get("mouse", False), "credits": args.get("credits", 0)})
-    except SystemExit:
-        pass
-    except Exception as e:
-        print("Erro no jogo:", e)
-        pygame.quit()
-
-if __name__ == "__main__":
-    main()
+import pygame
+import random
+import os
+import json
+import math
+import time
+import heapq
+import atexit
+import sys
+import gc
+import tracemalloc
+import threading
+from array import array
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from collections import namedtuple, deque
+
+pygame.init()
+
+# ----------------------------------------------------------
+# CONFIG
+# ----------------------------------------------------------
+# Opcoes de diagnostico via variaveis de ambiente (ex.: SPACE_LATENCY=1)
+def env_flag(name, default=False):
+    val = os.environ.get(name)
+    if val is None:
+        return default
+    return val.strip().lower() not in ("", "0", "false", "no", "off")
+
+def env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+WIDTH, HEIGHT = 800, 600
+FPS = env_int("SPACE_FPS", 60)
+VSYNC = env_flag("SPACE_VSYNC")
+DISPLAY_SCALED = env_flag("SPACE_SCALED") or VSYNC
+LATENCY_PROBE = env_flag("SPACE_LATENCY")
+SHOW_PERF_HUD = env_flag("SPACE_PERF_HUD")
+MAX_FRAME_SKIP = env_int("SPACE_MAX_FRAME_SKIP", 4)
+PRECISE_COLLISION = env_flag("SPACE_PRECISE_COLLISION")
+TELEMETRY = env_flag("SPACE_TELEMETRY")
+TELEMETRY_FILE = os.environ.get("SPACE_TELEMETRY_FILE", "telemetry.jsonl")
+METRICS_PORT = env_int("SPACE_METRICS_PORT", 0)
+REPLAY_SECONDS = env_int("SPACE_REPLAY", 0)
+REPLAY_SCALE = max(1, env_int("SPACE_REPLAY_SCALE", 2))
+REPLAY_FPS = max(1, env_int("SPACE_REPLAY_FPS", 30))
+REPLAY_FORMAT = os.environ.get("SPACE_REPLAY_FORMAT", "raw")
+HOT_RELOAD = env_flag("SPACE_HOT_RELOAD")
+REWIND_SECONDS = env_int("SPACE_REWIND", 0)
+ALLOC_TRACE = env_flag("SPACE_ALLOC_TRACE")
+GC_THRESHOLD = os.environ.get("SPACE_GC_THRESHOLD", "")
+GC_FREEZE = env_flag("SPACE_GC_FREEZE")
+display_flags = pygame.SCALED if DISPLAY_SCALED else 0
+try:
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), display_flags, vsync=int(VSYNC))
+except pygame.error:
+    # sem suporte a vsync neste backend
+    VSYNC = False
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), display_flags)
+pygame.display.set_caption("Space Escape - Alpha")
+
+# Relogio da simulacao em ms: so anda no update da cena de jogo, entao pausa,
+# contagem e menus nao consomem invulnerabilidade nem a cadencia do boss
+class GameClock:
+    def __init__(self):
+        self.ms = 0.0
+
+    def advance(self, dt):
+        self.ms += dt
+
+    def now(self):
+        return int(self.ms)
+
+game_clock = GameClock()
+
+
+
+# ----------------------------------------------------------
+#                   ASSETS
+# ----------------------------------------------------------
+
+ASSETS = {
+    "player1": "player1.png",
+    "player2": "player2.png",
+    "bullet": "bullet.png",
+    "meteoro_normal": "meteoro_normal.png",
+    "meteoro_amarelo": "meteoro_amarelo.png",
+    "meteoro_verde": "meteoro_verde.png",
+    "meteoro_teleport": "meteoro_teleport.png",
+    "boss_sprite": "boss_sprite.png",
+    "boss_engine": "boss_engine.png",
+    "shield": "shield.png",
+    "bg_phase1": "bg_phase1.png",
+    "bg_phase2": "bg_phase2.png",
+    "bg_phase3": "bg_phase3.png",
+    "bg_phase4": "bg_phase4.png",
+    "bg_boss": "bg_boss.png"
+}
+
+AUDIO_ASSETS = {
+    "intro": "intro.mp3",
+    "shoot": "shoot.WAV",
+    "hit": "hit.WAV",
+    "powerup_life": "powerup_life.WAV",
+    "powerup_shot": "powerup_shot.WAV",
+    "powerup_tp": "powerup_teleport.WAV",
+    "point": "point.wav",
+    "bg_phase1": "bg_phase1.mp3",
+    "bg_phase2": "bg_phase2.mp3",
+    "bg_phase3": "bg_phase3.mp3",
+    "bg_phase4": "bg_phase4.mp3",
+    "bg_boss": "bg_boss.mp3"
+}
+
+# COLORS & FONTS
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+YELLOW = (255, 220, 0)
+RED = (255, 60, 60)
+GREEN = (60, 255, 100)
+BLUE = (60, 100, 255)
+
+font = pygame.font.Font(None, 36)
+big_font = pygame.font.Font(None, 48)
+
+# GAME CONFIG
+# Valores de balanceamento: os padroes abaixo sao sobrescritos por config.json
+TUNING_FILE = "config.json"
+TUNING_DEFAULTS = {
+    "PHASE_TARGETS": {1: 50, 2: 75, 3: 100, 4: 125},
+    "MAX_METEORS_BASE": 5,
+    "MAX_METEORS_INCREMENT": 3,
+    "METEOR_MAX_SPEED": 12,
+    "BULLET_LIMIT": 9,
+    "INVULN_DURATION": 2000,
+    "TP_SHIELD_DURATION": 5000,
+    "PHASE_START_DELAY": 3000,
+    "PLAYER_START_LIVES": 5,
+    "BOSS_HP_LEFT": 100,
+    "BOSS_HP_CORE": 300,
+    "BOSS_HP_RIGHT": 100,
+    "BOSS_SHOOT_DELAY": 1200,
+    "SHOT_COOLDOWN": 150,
+}
+
+def is_int(val):
+    return isinstance(val, int) and not isinstance(val, bool)
+
+# Confere um valor contra o tipo do padrao; devolve o valor normalizado ou levanta ValueError
+def check_tuning_value(key, val):
+    if key == "PHASE_TARGETS":
+        if not isinstance(val, dict):
+            raise ValueError("PHASE_TARGETS deve ser um objeto {fase: pontos}")
+        try:
+            targets = {int(k): v for k, v in val.items()}
+        except (TypeError, ValueError):
+            raise ValueError("PHASE_TARGETS: as chaves devem ser numeros de fase")
+        if set(targets) != set(TUNING_DEFAULTS["PHASE_TARGETS"]):
+            raise ValueError("PHASE_TARGETS precisa das fases 1 a 4")
+        if not all(is_int(v) and v > 0 for v in targets.values()):
+            raise ValueError("PHASE_TARGETS: as metas devem ser inteiros positivos")
+        return targets
+    if not is_int(val):
+        raise ValueError(f"{key} deve ser inteiro, veio {val!r}")
+    return val
+
+# Parte de base (os padroes na carga, os valores em uso no hot reload) e
+# devolve None se o arquivo tiver qualquer problema: nada e aplicado pela metade
+def read_tuning(base=TUNING_DEFAULTS):
+    values = dict(base)
+    values["PHASE_TARGETS"] = dict(base["PHASE_TARGETS"])
+    if not os.path.exists(TUNING_FILE):
+        return values
+    try:
+        with open(TUNING_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("esperado um objeto JSON")
+        for key, val in data.items():
+            if key in TUNING_DEFAULTS:
+                values[key] = check_tuning_value(key, val)
+            else:
+                print("Chave desconhecida em", TUNING_FILE + ":", key)
+    except (OSError, ValueError) as e:
+        print("Erro ao ler", TUNING_FILE + ":", e)
+        return None
+    return values
+
+TUNING = read_tuning() or dict(TUNING_DEFAULTS)
+PHASE_TARGETS = TUNING["PHASE_TARGETS"]
+MAX_PHASE = 5
+MAX_METEORS_BASE = TUNING["MAX_METEORS_BASE"]
+MAX_METEORS_INCREMENT = TUNING["MAX_METEORS_INCREMENT"]
+METEOR_MAX_SPEED = TUNING["METEOR_MAX_SPEED"]
+BULLET_LIMIT = TUNING["BULLET_LIMIT"]
+INVULN_DURATION = TUNING["INVULN_DURATION"]
+TP_SHIELD_DURATION = TUNING["TP_SHIELD_DURATION"]
+PHASE_START_DELAY = TUNING["PHASE_START_DELAY"]
+PLAYER_START_LIVES = TUNING["PLAYER_START_LIVES"]
+BOSS_HP_LEFT = TUNING["BOSS_HP_LEFT"]
+BOSS_HP_CORE = TUNING["BOSS_HP_CORE"]
+BOSS_HP_RIGHT = TUNING["BOSS_HP_RIGHT"]
+BOSS_SHOOT_DELAY = TUNING["BOSS_SHOOT_DELAY"]
+SHOT_COOLDOWN = TUNING["SHOT_COOLDOWN"]
+SAVE_FILE = "savegame.json"
+HIGHSCORE_FILE = "highscores.json"
+TOP_SCORES = 10
+
+ENDLESS_PHASE = 6
+ENDLESS_RAMP_INTERVAL = 30000
+ENDLESS_RAMP_FACTOR = 1.4
+ENDLESS_MAX_SUSTAIN = 3000
+ENDLESS_ENTITY_BUDGET = 4000
+ENDLESS_SPAWN_DEPTH = 1500
+
+# LOD / CULLING
+LOD_FAR_MARGIN = 300
+LOD_BASE_INTERVAL = 2
+LOD_MAX_INTERVAL = 8
+STATS_PERIOD = 60000
+
+# QUALIDADE VISUAL (fracoes do tempo de um frame)
+QUALITY_DEGRADE_AT = 0.85
+QUALITY_RECOVER_AT = 0.55
+QUALITY_DEGRADE_FRAMES = 30
+QUALITY_RECOVER_FRAMES = 180
+QUALITY_COOLDOWN = 2000
+QUALITY_TIERS = ["completo", "fundo-simples", "motor-lento", "menos-particulas"]
+
+BOSS_W = 256
+BOSS_H = 128
+ENGINE_FRAMES = 10
+
+# ----------------------------------------------------------
+# HELPERS: IMAGEM/SOM/FALLBACK
+# ----------------------------------------------------------
+def load_image(filename, fallback_color=(100,100,100,0), size=None):
+    if filename and os.path.exists(filename):
+        try:
+            img = pygame.image.load(filename).convert_alpha()
+            if size:
+                img = pygame.transform.scale(img, size)
+            return img
+        except Exception:
+            pass
+    w, h = size if size else (50,50)
+    surf = pygame.Surface((w,h), pygame.SRCALPHA)
+    surf.fill(fallback_color)
+    return surf
+
+def load_sound(filename):
+    if filename and os.path.exists(filename):
+        try:
+            return pygame.mixer.Sound(filename)
+        except Exception:
+            return None
+    return None
+
+# Registro de imagens: tamanho final de cada chave de ASSETS (None = original).
+# Recarregar uma chave troca so a entrada dela em IMAGES.
+IMAGE_SIZES = {
+    "player1": (80,60),
+    "player2": (80,60),
+    "bullet": (24,24),
+    "meteoro_normal": (40,40),
+    "meteoro_amarelo": (40,40),
+    "meteoro_verde": (40,40),
+    "meteoro_teleport": (40,40),
+    "boss_sprite": None,
+    "boss_engine": None,
+    "shield": (90,90),
+    "bg_phase1": (WIDTH,HEIGHT),
+    "bg_phase2": (WIDTH,HEIGHT),
+    "bg_phase3": (WIDTH,HEIGHT),
+    "bg_phase4": (WIDTH,HEIGHT),
+    "bg_boss": (WIDTH,HEIGHT)
+}
+
+def load_registered_image(key):
+    return load_image(ASSETS.get(key,""), size=IMAGE_SIZES.get(key))
+
+# Load images
+IMAGES = {key: load_registered_image(key) for key in IMAGE_SIZES}
+
+SOUNDS = {k: load_sound(v) for k,v in AUDIO_ASSETS.items()}
+
+# ----------------------------------------------------------
+# CONTROLE MUSICAS
+# ----------------------------------------------------------
+def play_music_for_phase(phase):
+    key = None
+    if phase == 1: key = "bg_phase1"
+    elif phase == 2: key = "bg_phase2"
+    elif phase == 3: key = "bg_phase3"
+    elif phase == 4: key = "bg_phase4"
+    elif phase == 5: key = "bg_boss"
+    elif phase == ENDLESS_PHASE: key = "bg_phase4"
+    path = AUDIO_ASSETS.get(key,"")
+    if path and os.path.exists(path):
+        try:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(0.3)
+            pygame.mixer.music.play(-1)
+        except Exception:
+            pass
+    else:
+        try:
+            pygame.mixer.music.stop()
+        except:
+            pass
+
+def play_intro_music():
+    path = AUDIO_ASSETS.get("intro","")
+    if path and os.path.exists(path):
+        try:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(0.35)
+            pygame.mixer.music.play(-1)
+        except:
+            pass
+    else:
+        try:
+            pygame.mixer.music.stop()
+        except:
+            pass
+
+def stop_music():
+    try:
+        pygame.mixer.music.stop()
+    except:
+        pass
+
+# ----------------------------------------------------------
+# SAVE
+# ----------------------------------------------------------
+def clamp(n, a, b):
+    return max(a, min(b, n))
+
+def save_json(filepath, data, compact=False):
+    try:
+        with open(filepath, "w", encoding="utf-8") as f:
+            if compact:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        return True
+    except Exception as e:
+        print("Erro ao salvar JSON:", e)
+        return False
+
+def load_json(filepath):
+    if not os.path.exists(filepath):
+        return None
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print("Erro ao ler JSON:", e)
+        return None
+
+# ----------------------------------------------------------
+# SPRITESHEET
+# ----------------------------------------------------------
+class SpriteAnimation:
+    __slots__ = ("frames", "frame_w", "frame_h", "frame_time", "last_update", "current_frame", "slowdown")
+
+    def __init__(self, spritesheet_surf, frame_w, frame_h, frame_time=100, frames_count=None):
+        self.frames = []
+        self.frame_w = frame_w
+        self.frame_h = frame_h
+        self.frame_time = frame_time
+        self.last_update = game_clock.now()
+        self.current_frame = 0
+        self.slowdown = 1
+
+        if spritesheet_surf:
+            sheet_w = spritesheet_surf.get_width()
+            total = frames_count if frames_count else max(1, sheet_w // frame_w)
+            for i in range(total):
+                rect = pygame.Rect(i * frame_w, 0, frame_w, frame_h)
+                try:
+                    frame = spritesheet_surf.subsurface(rect).copy()
+                except Exception:
+                    frame = pygame.Surface((frame_w, frame_h), pygame.SRCALPHA)
+                self.frames.append(frame)
+
+    def update(self):
+        if len(self.frames) <= 1:
+            return
+        now = game_clock.now()
+        if now - self.last_update >= self.frame_time * self.slowdown:
+            self.last_update = now
+            self.current_frame = (self.current_frame + 1) % len(self.frames)
+
+    def get_frame(self):
+        if not self.frames:
+            return None
+        return self.frames[self.current_frame]
+
+# ----------------------------------------------------------
+# MASCARAS DE COLISAO
+# ----------------------------------------------------------
+# Mascara calculada uma vez por sprite/tamanho e guardada junto dele.
+# Sprite totalmente transparente (fallback sem arquivo) vira caixa cheia.
+def sprite_mask(surf, size=None):
+    if surf is None:
+        return pygame.mask.Mask(size or (40, 40), fill=True)
+    if size and surf.get_size() != tuple(size):
+        surf = pygame.transform.scale(surf, size)
+    mask = pygame.mask.from_surface(surf)
+    if mask.count() == 0:
+        mask.fill()
+    return mask
+
+# Teste fino; so chamar para pares que ja passaram no colliderect
+def masks_overlap(rect_a, mask_a, rect_b, mask_b):
+    return mask_a.overlap(mask_b, (rect_b.x - rect_a.x, rect_b.y - rect_a.y)) is not None
+
+# ----------------------------------------------------------
+# CLASSES: Projectile, Player, Meteor, Boss
+# ----------------------------------------------------------
+
+# Dados imutaveis compartilhados por tipo; cada entidade guarda so a tag inteira
+EntityType = namedtuple("EntityType", "name image_key image size speed_range sound mask")
+
+def entity_type(name, image_key, size, speed_range, sound):
+    image = IMAGES.get(image_key)
+    return EntityType(name, image_key, image, size, speed_range, sound, sprite_mask(image, size))
+
+POWERUP_LIFE, POWERUP_SHOT, POWERUP_TP = 0, 1, 2
+POWERUP_TYPES = [
+    entity_type("life", "meteoro_verde", (40, 40), (3, 3), "powerup_life"),
+    entity_type("shot", "meteoro_amarelo", (40, 40), (3, 3), "powerup_shot"),
+    entity_type("tp", "meteoro_teleport", (40, 40), (3, 3), "powerup_tp"),
+]
+POWERUP_KIND_BY_NAME = {t.name: kind for kind, t in enumerate(POWERUP_TYPES)}
+
+METEOR_NORMAL = 0
+METEOR_TYPES = [
+    entity_type("normal", "meteoro_normal", (40, 40), (3, METEOR_MAX_SPEED), "point"),
+]
+
+PLAYER_SPRITES = {
+    1: (IMAGES["player1"], sprite_mask(IMAGES["player1"])),
+    2: (IMAGES["player2"], sprite_mask(IMAGES["player2"])),
+}
+
+class Powerup:
+    __slots__ = ("rect", "kind")
+
+    def __init__(self, x, y, kind):
+        self.rect = pygame.Rect(int(x), int(y), *POWERUP_TYPES[kind].size)
+        self.kind = kind
+
+    def update(self, steps=1):
+        self.rect.y += POWERUP_TYPES[self.kind].speed_range[0] * steps
+
+def apply_powerup_life(p):
+    p.lives += 1
+
+def apply_powerup_shot(p):
+    p.shot_level = clamp(p.shot_level + 1, 1, MAX_SHOT_LEVEL)
+
+def apply_powerup_tp(p):
+    p.rect.centerx = WIDTH//2
+    p.rect.centery = HEIGHT - 120
+    p.invulnerable_until = game_clock.now() + TP_SHIELD_DURATION
+
+POWERUP_EFFECTS = (apply_powerup_life, apply_powerup_shot, apply_powerup_tp)
+
+class Projectile:
+    __slots__ = ("rect", "vx", "vy", "owner", "speed")
+    # a hitbox do projetil e a propria caixa 6x12
+    mask = pygame.mask.Mask((6, 12), fill=True)
+
+    def __init__(self, x, y, vx, vy, owner, speed=12):
+        self.rect = pygame.Rect(int(x), int(y), 6, 12)
+        self.vx = vx
+        self.vy = vy
+        self.owner = owner
+        self.speed = speed
+
+    def update(self):
+        self.rect.x += int(self.vx)
+        self.rect.y += int(self.vy)
+
+# ----------------------------------------------------------
+# ARMAS
+# ----------------------------------------------------------
+# Leque de cada nivel de tiro, em fracoes de "spacing" (55% da largura da nave).
+# Um powerup de arma novo so precisa de mais uma entrada aqui.
+WEAPON_SPREADS = {
+    1: (0,),
+    2: (-0.5, 0.5),
+    3: (-1, 0, 1),
+}
+MAX_SHOT_LEVEL = max(WEAPON_SPREADS)
+SHOT_SPEED = -12
+
+# Uma rajada por vez, no maximo uma a cada SHOT_COOLDOWN ms de jogo,
+# independente de quantos frames o botao fica apertado
+class Weapon:
+    __slots__ = ("cooldown", "next_shot", "templates")
+
+    def __init__(self, ship_width):
+        self.cooldown = SHOT_COOLDOWN
+        self.next_shot = 0
+        self.build_templates(ship_width)
+
+    # deslocamentos (dx, dy) de cada bala a partir do topo-centro da nave, por nivel
+    def build_templates(self, ship_width):
+        bullet = IMAGES["bullet"]
+        bw, bh = bullet.get_width(), bullet.get_height()
+        spacing = int(ship_width * 0.55)
+        self.templates = {}
+        for level, spread in WEAPON_SPREADS.items():
+            self.templates[level] = tuple((int(spacing * f) - bw//2, -(bh//2)) for f in spread)
+
+    # devolve quantas balas sairam
+    def fire(self, p, now):
+        if now < self.next_shot or not p.can_shoot():
+            return 0
+        self.next_shot = now + self.cooldown
+        x, y = p.rect.centerx, p.rect.top
+        template = self.templates[p.shot_level]
+        for dx, dy in template:
+            p.bullets.append(Projectile(x + dx, y + dy, 0, SHOT_SPEED, p.number))
+        if SOUNDS.get("shoot"):
+            try:
+                SOUNDS["shoot"].play()
+            except:
+                pass
+        return len(template)
+
+class Player:
+    __slots__ = ("number", "image", "mask", "rect", "speed", "lives", "invulnerable_until",
+                 "shot_level", "bullets", "max_bullets", "width", "height", "weapon")
+
+    def __init__(self, number, x, y):
+        self.number = number
+        self.image, self.mask = PLAYER_SPRITES[1] if number == 1 else PLAYER_SPRITES[2]
+        self.rect = self.image.get_rect(center=(x,y))
+        self.speed = 7
+        self.lives = PLAYER_START_LIVES
+        self.invulnerable_until = 0
+        self.shot_level = 1
+        self.bullets = []
+        self.max_bullets = BULLET_LIMIT
+        self.width = self.rect.width
+        self.height = self.rect.height
+        self.weapon = Weapon(self.width)
+
+    def refresh_sprite(self):
+        self.image, self.mask = PLAYER_SPRITES[1] if self.number == 1 else PLAYER_SPRITES[2]
+        self.rect = self.image.get_rect(center=self.rect.center)
+        self.width = self.rect.width
+        self.height = self.rect.height
+        self.weapon.build_templates(self.width)
+
+    def can_shoot(self):
+        return len(self.bullets) < self.max_bullets
+
+    def take_damage(self, cause="meteoro"):
+        now = game_clock.now()
+        if now < self.invulnerable_until:
+            return False
+        self.lives -= 1
+        self.invulnerable_until = now + INVULN_DURATION
+        telemetry.emit("player_hit", player=self.number, lives=self.lives, cause=cause)
+        if self.lives == 0:
+            telemetry.emit("death", player=self.number, cause=cause)
+        if SOUNDS.get("hit"):
+            try:
+                SOUNDS["hit"].play()
+            except:
+                pass
+        return True
+
+    # pisca enquanto invulneravel
+    def visible(self, now):
+        return now >= self.invulnerable_until or (now // 120) % 2 == 1
+
+    def draw(self, surf):
+        if self.visible(game_clock.now()):
+            surf.blit(self.image, self.rect)
+
+class Meteor:
+    __slots__ = ("rect", "speed", "kind")
+
+    def __init__(self, x, y, speed=4, kind=METEOR_NORMAL):
+        self.rect = pygame.Rect(int(x), int(y), *METEOR_TYPES[kind].size)
+        self.speed = speed
+        self.kind = kind
+
+    def update(self, steps=1):
+        self.rect.y += self.speed * steps
+
+class Boss:
+    __slots__ = ("w", "h", "sprite", "part_masks", "rect", "hp_left", "hp_core", "hp_right", "max_left", "max_core",
+                 "max_right", "projectiles", "shoot_delay", "last_shot", "engine_anim", "engine_offset_y")
+
+    def __init__(self, center_x, center_y):
+        self.w, self.h = BOSS_W, BOSS_H
+        self.rect = pygame.Rect(center_x - self.w//2, center_y - self.h//2, self.w, self.h)
+        self.load_sprites()
+
+        self.hp_left = BOSS_HP_LEFT
+        self.hp_core = BOSS_HP_CORE
+        self.hp_right = BOSS_HP_RIGHT
+        self.max_left = BOSS_HP_LEFT
+        self.max_core = BOSS_HP_CORE
+        self.max_right = BOSS_HP_RIGHT
+
+        self.projectiles = []
+        self.shoot_delay = BOSS_SHOOT_DELAY
+        self.last_shot = game_clock.now()
+        self.engine_offset_y = self.h // 2 + 25
+
+    # Sprite, mascaras e motor vem de IMAGES; chamado de novo quando a arte muda
+    def load_sprites(self):
+        raw = IMAGES.get("boss_sprite")
+        self.sprite = pygame.transform.scale(raw, (self.w, self.h)) if raw else None
+
+        # uma mascara por parte (esquerda, nucleo, direita) com o deslocamento em x
+        third = self.w // 3
+        self.part_masks = []
+        for name, x0, x1 in (("left", 0, third), ("core", third, 2*third), ("right", 2*third, self.w)):
+            part = self.sprite.subsurface((x0, 0, x1 - x0, self.h)) if self.sprite else None
+            self.part_masks.append((name, x0, sprite_mask(part, (x1 - x0, self.h))))
+
+        # ANIMAÇÃO DOS MOTORES
+        sheet = IMAGES.get("boss_engine")
+        if sheet and sheet.get_width() > 0 and sheet.get_height() > 0:
+            orig_w = sheet.get_width()
+            orig_h = sheet.get_height()
+            frames_count = max(2, orig_w // max(1, orig_h))
+            frame_w = orig_w // frames_count
+
+            scaled_sheet = pygame.Surface((self.w * frames_count, self.h), pygame.SRCALPHA)
+            for i in range(frames_count):
+                try:
+                    src_rect = pygame.Rect(i * frame_w, 0, frame_w, orig_h)
+                    frame = sheet.subsurface(src_rect)
+                    scaled = pygame.transform.scale(frame, (self.w, self.h))
+                    scaled_sheet.blit(scaled, (i * self.w, 0))
+                except:
+                    pass
+            self.engine_anim = SpriteAnimation(scaled_sheet, self.w, self.h, frame_time=90, frames_count=frames_count)
+        else:
+            self.engine_anim = None
+
+    def total_hp(self): return max(0,self.hp_left) + max(0,self.hp_core) + max(0,self.hp_right)
+    def max_total_hp(self): return self.max_left + self.max_core + self.max_right
+    def is_defeated(self): return self.total_hp() <= 0
+
+    def part_hit(self, rect, precise=False):
+        if not self.rect.colliderect(rect):
+            return None
+        if not precise:
+            rel_x = rect.centerx - self.rect.left
+            third = self.rect.width / 3.0
+            if rel_x < third: return "left"
+            if rel_x < 2*third: return "core"
+            return "right"
+        for name, x0, mask in self.part_masks:
+            if mask.overlap(Projectile.mask, (rect.x - self.rect.x - x0, rect.y - self.rect.y)):
+                return name
+        return None
+
+    # devolve True quando o golpe acabou de destruir a parte
+    def take_damage_to_part(self, part, dmg):
+        before = getattr(self, "hp_" + part, 0)
+        if part == "left": self.hp_left = max(0, self.hp_left - dmg)
+        elif part == "core": self.hp_core = max(0, self.hp_core - dmg)
+        elif part == "right": self.hp_right = max(0, self.hp_right - dmg)
+        return before > 0 and getattr(self, "hp_" + part, 0) == 0
+
+    def update(self, players):
+        if self.engine_anim: self.engine_anim.update()
+        now = game_clock.now()
+        if now - self.last_shot > self.shoot_delay:
+            targets = [p for p in players if p and p.lives > 0]
+            if targets:
+                alive = []
+                if self.hp_left > 0: alive.append("left")
+                if self.hp_core > 0: alive.append("core")
+                if self.hp_right > 0: alive.append("right")
+                if alive:
+                    part = random.choice(alive)
+                    offset = -self.w//3 if part == "left" else self.w//3 if part == "right" else 0
+                    shooter_x = self.rect.centerx + offset
+                    target = random.choice(targets)
+                    dx = target.rect.centerx - shooter_x
+                    dy = target.rect.centery - self.rect.centery
+                    dist = math.hypot(dx, dy) or 1
+                    speed = 4.5
+                    proj = Projectile(shooter_x, self.rect.centery, dx/dist*speed, dy/dist*speed, "boss")
+                    self.projectiles.append(proj)
+            self.last_shot = now
+
+        projectiles = self.projectiles
+        keep = 0
+        for p in projectiles:
+            p.update()
+            if 0 <= p.rect.centerx <= WIDTH and 0 <= p.rect.centery <= HEIGHT:
+                projectiles[keep] = p
+                keep += 1
+        del projectiles[keep:]
+
+    def submit(self, queue):
+        if self.sprite:
+            queue.add(LAYER_BOSS, self.sprite, self.rect)
+        if self.engine_anim:
+            frame = self.engine_anim.get_frame()
+            if frame:
+                queue.add(LAYER_BOSS, frame, frame.get_rect(center=(self.rect.centerx, self.rect.centery + self.engine_offset_y)))
+        shot = BOSS_SHOT_SPRITE
+        queue.extend(LAYER_BOSS, [(shot, (proj.rect.centerx - 9, proj.rect.centery - 9)) for proj in self.projectiles])
+
+    # barra de vida: primitivas, desenhada depois da fila
+    def draw_hp_bar(self, surf):
+        total, max_t = self.total_hp(), self.max_total_hp()
+        bar_w, bar_h = 340, 16
+        x = self.rect.centerx - bar_w//2
+        y = self.rect.top - 40
+        pygame.draw.rect(surf, (80,0,0), (x, y, bar_w, bar_h))
+        if max_t > 0:
+            pygame.draw.rect(surf, (0,255,0), (x, y, int(bar_w * total / max_t), bar_h))
+
+BOSS_SHOT_SPRITE = pygame.Surface((18, 18), pygame.SRCALPHA)
+pygame.draw.circle(BOSS_SHOT_SPRITE, (255,80,80), (9, 9), 9)
+# ----------------------------------------------------------
+# LATENCIA ENTRADA -> TELA
+# ----------------------------------------------------------
+LATENCY_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION)
+LATENCY_BUCKET_MS = 2
+LATENCY_BUCKETS = 50
+LATENCY_MAX_SAMPLES = 20000
+
+# Marca cada entrada com o instante em que o jogo a leu e, no flip do frame
+# que ela afetou primeiro, registra o tempo decorrido. O evento pode ter
+# chegado em qualquer momento desde a leitura anterior, entao o relatorio
+# mostra o limite inferior (leitura->flip) e o superior (leitura anterior->flip).
+class LatencyProbe:
+    def __init__(self):
+        self.pending = []
+        self.last_poll = time.perf_counter()
+        self.poll_time = self.last_poll
+        self.tick = 0
+        self.samples = []
+        self.upper = []
+        self.frames_late = {}
+        self.histogram = [0] * (LATENCY_BUCKETS + 1)
+        self.video_driver = pygame.display.get_driver()
+
+    def poll(self):
+        self.last_poll = self.poll_time
+        self.poll_time = time.perf_counter()
+        self.tick += 1
+
+    def input(self, kind):
+        self.pending.append((self.poll_time, self.last_poll, self.tick, kind))
+
+    def record_events(self, events, mouse_control=False):
+        for ev in events:
+            if ev.type in LATENCY_EVENTS:
+                if ev.type == pygame.MOUSEMOTION and not mouse_control:
+                    continue
+                self.input(pygame.event.event_name(ev.type))
+
+    def discard_pending(self):
+        self.pending.clear()
+
+    def frame_presented(self):
+        now = time.perf_counter()
+        for t_poll, t_prev, tick, kind in self.pending:
+            ms = (now - t_poll) * 1000.0
+            if len(self.samples) < LATENCY_MAX_SAMPLES:
+                self.samples.append(ms)
+                self.upper.append((now - t_prev) * 1000.0)
+            self.histogram[min(LATENCY_BUCKETS, int(ms // LATENCY_BUCKET_MS))] += 1
+            late = self.tick - tick
+            self.frames_late[late] = self.frames_late.get(late, 0) + 1
+        self.pending.clear()
+
+    def settings_label(self):
+        return (f"vsync={int(VSYNC)} fps_cap={FPS} scaled={int(DISPLAY_SCALED)} "
+                f"video={self.video_driver} render={os.environ.get('SDL_RENDER_DRIVER', 'default')}")
+
+    def report(self):
+        lines = [f"Latencia entrada->flip [{self.settings_label()}]"]
+        if not self.samples:
+            lines.append("  sem amostras")
+            return "\n".join(lines)
+        ordered = sorted(self.samples)
+        upper = sorted(self.upper)
+        def pct(lst, q):
+            return lst[min(len(lst) - 1, int(q * len(lst)))]
+        lines.append(f"  amostras={sum(self.histogram)} media={sum(ordered)/len(ordered):.2f}ms "
+                     f"p50={pct(ordered, 0.5):.2f} p95={pct(ordered, 0.95):.2f} p99={pct(ordered, 0.99):.2f} max={ordered[-1]:.2f}")
+        lines.append(f"  limite superior: p50={pct(upper, 0.5):.2f} p95={pct(upper, 0.95):.2f} max={upper[-1]:.2f}")
+        lines.append(f"  frames de atraso: {dict(sorted(self.frames_late.items()))}")
+        peak = max(self.histogram)
+        for i, count in enumerate(self.histogram):
+            if count:
+                lo = i * LATENCY_BUCKET_MS
+                label = f"{lo:>3}-{lo + LATENCY_BUCKET_MS:<3}ms" if i < LATENCY_BUCKETS else f">={lo}ms   "
+                lines.append(f"  {label} {count:>6} {'#' * max(1, 40 * count // peak)}")
+        return "\n".join(lines)
+
+latency_probe = LatencyProbe() if LATENCY_PROBE else None
+if latency_probe:
+    atexit.register(lambda: print(latency_probe.report()))
+
+def present_frame():
+    pygame.display.flip()
+    if latency_probe:
+        latency_probe.frame_presented()
+    if game_metrics:
+        game_metrics.frame_presented()
+
+# ----------------------------------------------------------
+# UI / HUD
+# ----------------------------------------------------------
+FONT_CACHE = {}
+
+def get_font(size):
+    f = FONT_CACHE.get(size)
+    if f is None:
+        f = FONT_CACHE[size] = pygame.font.Font(None, size)
+    return f
+
+def draw_text_center(text, y, size=36, color=WHITE, surf=None):
+    text_surf = get_font(size).render(text, True, color)
+    rect = text_surf.get_rect(center=(WIDTH//2, y))
+    (surf or screen).blit(text_surf, rect)
+
+SHIELD_SPRITES = {}
+
+# Escudo escalado para o tamanho da nave, guardado por tamanho
+def shield_sprite(rect):
+    size = (rect.width + 24, rect.height + 24)
+    if size not in SHIELD_SPRITES:
+        SHIELD_SPRITES[size] = pygame.transform.scale(IMAGES["shield"], size)
+    shield_img = SHIELD_SPRITES[size]
+    return shield_img, shield_img.get_rect(center=rect.center)
+
+BG_FLAT_COLORS = {}
+PHASE_BACKGROUNDS = {1:"bg_phase1",2:"bg_phase2",3:"bg_phase3",4:"bg_phase4",5:"bg_boss",ENDLESS_PHASE:"bg_phase4"}
+
+def draw_background(surf, bg_key, flat=False):
+    surf.fill((5,5,20))
+    if not bg_key or not os.path.exists(ASSETS.get(bg_key,"")):
+        return
+    try:
+        if flat:
+            # modo barato: so a cor media da imagem
+            if bg_key not in BG_FLAT_COLORS:
+                BG_FLAT_COLORS[bg_key] = pygame.transform.average_color(IMAGES[bg_key])[:3]
+            surf.fill(BG_FLAT_COLORS[bg_key])
+        else:
+            surf.blit(IMAGES[bg_key], (0,0))
+    except:
+        pass
+
+def draw_perf_hud(governor, quality):
+    fps = 1000.0 / max(0.001, governor.update_ms + governor.render_ms)
+    text = (f"upd {governor.update_ms:.1f}ms  draw {governor.render_ms:.1f}ms  max~{fps:.0f}fps  "
+            f"SKIP {governor.skips_last_second()}/s total {governor.skipped_total}  Q:{QUALITY_TIERS[quality.tier]}")
+    surf = font.render(text, True, YELLOW)
+    screen.blit(surf, (10, HEIGHT - 56))
+
+# ----------------------------------------------------------
+# FILA DE DESENHO
+# ----------------------------------------------------------
+LAYER_ENEMIES, LAYER_PLAYERS, LAYER_BULLETS, LAYER_BOSS, LAYER_EFFECTS, LAYER_HUD = range(6)
+LAYER_COUNT = 6
+
+# Cada camada junta (superficie, posicao) e vira um unico Surface.blits no
+# flush, na ordem das camadas; dentro da camada vale a ordem de envio.
+class RenderQueue:
+    def __init__(self, layers=LAYER_COUNT):
+        self.layers = [[] for _ in range(layers)]
+
+    def add(self, layer, surf, pos):
+        self.layers[layer].append((surf, pos))
+
+    def extend(self, layer, items):
+        self.layers[layer].extend(items)
+
+    def flush(self, target):
+        for items in self.layers:
+            if items:
+                target.blits(items, False)
+                items.clear()
+
+# Entidades do jogo na fila; devolve quantas entraram (as acima da tela ficam de fora)
+def submit_world(queue, meteors, powerups, players, boss, particles, now):
+    visible = [(METEOR_TYPES[m.kind].image, m.rect) for m in meteors if m.rect.bottom > 0]
+    visible += [(POWERUP_TYPES[pu.kind].image, pu.rect) for pu in powerups if pu.rect.bottom > 0]
+    queue.extend(LAYER_ENEMIES, visible)
+
+    bullet_img = IMAGES["bullet"]
+    for p in players:
+        if p:
+            if p.visible(now):
+                queue.add(LAYER_PLAYERS, p.image, p.rect)
+            if p.invulnerable_until > now:
+                queue.add(LAYER_PLAYERS, *shield_sprite(p.rect))
+            queue.extend(LAYER_BULLETS, [(bullet_img, b.rect) for b in p.bullets])
+
+    if boss: boss.submit(queue)
+    queue.extend(LAYER_EFFECTS, particles.sequence(now))
+    return len(visible)
+
+# Textos do HUD renderizados so quando mudam; o texto so e formatado quando
+# os valores mudam, entao um frame sem mudanca nao cria strings
+class HudLayer:
+    def __init__(self):
+        self.cache = {}
+
+    def text(self, slot, fmt, *values):
+        entry = self.cache.get(slot)
+        if entry is None or entry[0] != values:
+            entry = self.cache[slot] = (values, font.render(fmt.format(*values), True, WHITE))
+        return entry[1]
+
+    def submit(self, queue, players, phase_score, phase, phase_target, credits=0):
+        y = 8
+        for p in players:
+            if p:
+                surf = self.text(p.number, "P{} Vidas:{} Tiros:{} BalasTela:{}", p.number, p.lives, p.shot_level, len(p.bullets))
+                queue.add(LAYER_HUD, surf, (10, y))
+                y += 24
+        queue.add(LAYER_HUD, self.text("phase", "Fase: {}", phase if phase < ENDLESS_PHASE else "INF"), (WIDTH - 150, 8))
+        queue.add(LAYER_HUD, self.text("target", "Pontos: {} / {}", phase_score, phase_target), (WIDTH - 320, 35))
+        queue.add(LAYER_HUD, self.text("credits", "CREDIT(S): {}", credits), (WIDTH//2 - 60, HEIGHT - 30))
+
+# ----------------------------------------------------------
+# PARTICULAS
+# ----------------------------------------------------------
+PARTICLE_BUDGET = 6000
+PARTICLE_FADE_STEPS = 4
+PARTICLE_DIRECTIONS = [(math.cos(a * math.tau / 64), math.sin(a * math.tau / 64)) for a in range(64)]
+BOSS_DEATH_PARTICLES = 4000
+BOSS_DEATH_MS = 1500
+
+# Quadros pre-renderizados do maior para o menor/mais transparente
+def particle_sprites(color, radius, steps=PARTICLE_FADE_STEPS):
+    frames = []
+    for i in range(steps):
+        surf = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+        pygame.draw.circle(surf, (*color, 255 * (steps - i) // steps), (radius, radius), max(1, radius * (steps - i) // steps))
+        frames.append(surf)
+    return tuple(frames)
+
+# vida em ms, velocidades em px/ms, gravidade em px/ms^2
+ParticleKind = namedtuple("ParticleKind", "sprites half life speed_min speed_max gravity")
+
+def particle_kind(color, radius, life, speed_min, speed_max, gravity=0.0):
+    return ParticleKind(particle_sprites(color, radius), radius, life, speed_min, speed_max, gravity)
+
+PARTICLE_KINDS = {
+    "explosion": particle_kind((255,150,40), 4, 600, 0.05, 0.25),
+    "debris": particle_kind((150,140,130), 3, 900, 0.04, 0.18, 0.0004),
+    "spark": particle_kind((255,240,120), 2, 250, 0.1, 0.4),
+    "trail": particle_kind((120,180,255), 3, 300, 0.0, 0.03),
+}
+
+# Particulas vivas ficam juntas em arrays de tamanho fixo, na ordem em que
+# nasceram. Cada emissao e um "burst" (inicio, quantidade, nascimento, tipo):
+# a posicao sai direto da formula x0 + v*t (+ gravidade), entao nao ha passo
+# de integracao por particula, e quando estoura o orcamento as mais antigas
+# (tambem as mais apagadas) saem primeiro.
+class ParticleSystem:
+    def __init__(self, budget=PARTICLE_BUDGET):
+        self.capacity = budget
+        self.budget = budget
+        self.xs = array("f", bytes(4 * budget))
+        self.ys = array("f", bytes(4 * budget))
+        self.vxs = array("f", bytes(4 * budget))
+        self.vys = array("f", bytes(4 * budget))
+        self.bursts = []
+        self.live = 0
+        self.blit_seq = []
+
+    def set_fraction(self, fraction):
+        self.budget = int(self.capacity * fraction)
+        if self.live > self.budget:
+            self.shed(self.live - self.budget)
+
+    def emit(self, kind_name, x, y, count, now, area=None, vx=0.0, vy=0.0):
+        kind = PARTICLE_KINDS[kind_name]
+        count = min(int(count * self.budget / self.capacity), self.budget)
+        if count <= 0:
+            return
+        if self.live + count > self.budget:
+            self.shed(self.live + count - self.budget)
+        aw, ah = area if area else (0, 0)
+        x -= kind.half + aw / 2
+        y -= kind.half + ah / 2
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        rnd = random.random
+        dirs = PARTICLE_DIRECTIONS
+        smin, srange = kind.speed_min, kind.speed_max - kind.speed_min
+        start = self.live
+        for i in range(start, start + count):
+            dx, dy = dirs[int(rnd() * 64)]
+            speed = smin + srange * rnd()
+            xs[i] = x + aw * rnd()
+            ys[i] = y + ah * rnd()
+            vxs[i] = vx + dx * speed
+            vys[i] = vy + dy * speed
+        self.bursts.append([start, count, now, kind])
+        self.live += count
+
+    # Tira n particulas do comeco (as mais antigas)
+    def shed(self, n):
+        for b in self.bursts:
+            if n <= 0:
+                break
+            cut = min(n, b[1])
+            b[0] += cut
+            b[1] -= cut
+            n -= cut
+        self.compact()
+
+    # Junta os bursts vivos no inicio dos arrays (memmove por fatia)
+    def compact(self):
+        write = 0
+        alive = []
+        for b in self.bursts:
+            start, count = b[0], b[1]
+            if count <= 0:
+                continue
+            if start != write:
+                for arr in (self.xs, self.ys, self.vxs, self.vys):
+                    arr[write:write + count] = arr[start:start + count]
+                b[0] = write
+            write += count
+            alive.append(b)
+        self.bursts = alive
+        self.live = write
+
+    def update(self, now):
+        expired = False
+        for b in self.bursts:
+            if now - b[2] >= b[3].life:
+                b[1] = 0
+                expired = True
+        if expired:
+            self.compact()
+
+    def draw(self, surf, now):
+        if self.bursts:
+            surf.blits(self.sequence(now), False)
+
+    # lista (sprite, posicao) reaproveitada entre frames
+    def sequence(self, now):
+        seq = self.blit_seq
+        seq.clear()
+        xs, ys, vxs, vys = self.xs, self.ys, self.vxs, self.vys
+        for start, count, born, kind in self.bursts:
+            t = now - born
+            frames = kind.sprites
+            sprite = frames[min(len(frames) - 1, int(t * len(frames) / kind.life))]
+            fall = 0.5 * kind.gravity * t * t
+            end = start + count
+            seq.extend([(sprite, (x + vx * t, y + vy * t + fall))
+                        for x, y, vx, vy in zip(xs[start:end], ys[start:end], vxs[start:end], vys[start:end])])
+        return seq
+
+    def explode(self, rect, now, count=40):
+        self.emit("explosion", rect.centerx, rect.centery, count, now)
+        self.emit("debris", rect.centerx, rect.centery, count // 3, now)
+
+    def boss_death(self, rect, now):
+        self.emit("explosion", rect.centerx, rect.centery, BOSS_DEATH_PARTICLES * 3 // 4, now, area=rect.size)
+        self.emit("debris", rect.centerx, rect.centery, BOSS_DEATH_PARTICLES // 4, now, area=rect.size)
+
+# ----------------------------------------------------------
+# SPAWN DE METEOROS E POWERUPS
+# ----------------------------------------------------------
+# Roteiro de cada fase (tempos em ms de jogo desde o inicio da fase):
+#   sustain      meteoros mantidos vivos; cada meteoro perdido agenda um respawn.
+#                Sem a chave, vem de MAX_METEORS_BASE + (fase-1) * MAX_METEORS_INCREMENT
+#   sustain_max  teto do sustain (cada powerup coletado aumenta o sustain em 1)
+#   sustain_bonus  sem sustain_max: quanto os powerups podem somar ao sustain da fase
+#   opening      janela em que os meteoros iniciais entram na tela
+#   respawn      atraso (min, max) para repor um meteoro destruido ou que saiu da tela
+#   powerups     quantidade (min, max) de powerups da fase, espalhados pela janela
+#   waves        ondas extras: (instante, quantidade, espacamento); entram como
+#                eventos "wave", que nao contam no pending do sustain
+WAVE_SCRIPTS = {
+    1: {"sustain_bonus": 7, "opening": (0, 2500), "respawn": (0, 900),
+        "powerups": (7, 12), "powerup_window": (500, 7000), "waves": [(20000, 4, 300)]},
+    2: {"sustain_bonus": 8, "opening": (0, 2500), "respawn": (0, 800),
+        "powerups": (8, 13), "powerup_window": (500, 7000), "waves": [(15000, 5, 250), (35000, 6, 250)]},
+    3: {"sustain_bonus": 9, "opening": (0, 2500), "respawn": (0, 700),
+        "powerups": (9, 14), "powerup_window": (500, 7000), "waves": [(12000, 6, 200), (30000, 8, 200)]},
+    4: {"sustain_bonus": 10, "opening": (0, 2500), "respawn": (0, 600),
+        "powerups": (10, 15), "powerup_window": (500, 7000),
+        "waves": [(10000, 8, 150), (25000, 10, 150), (40000, 12, 120)]},
+    5: {"sustain": 0, "sustain_max": 0, "powerups": (0, 0), "waves": []},
+    ENDLESS_PHASE: {"sustain": 20, "sustain_max": ENDLESS_MAX_SUSTAIN, "opening": (0, 3000), "respawn": (0, 1500),
+                    "powerups": (6, 10), "powerup_window": (1000, 20000), "waves": []},
+}
+MAX_LIVE_ENTITIES = 60
+BUDGET_RETRY_DELAY = 250
+
+POWERUP_WEIGHTS = ((0.35, POWERUP_LIFE), (0.70, POWERUP_SHOT), (1.0, POWERUP_TP))
+
+def meteor_speed_for_phase(phase):
+    lo, hi = METEOR_TYPES[METEOR_NORMAL].speed_range
+    return random.randint(lo + (phase - 1), min(hi, 5 + (phase - 1) * 2))
+
+def make_powerup(kind, x, y):
+    return Powerup(x, y, kind)
+
+def random_powerup_type():
+    r = random.random()
+    for limit, typ in POWERUP_WEIGHTS:
+        if r < limit:
+            return typ
+    return POWERUP_WEIGHTS[-1][1]
+
+# Agenda os spawns da fase numa fila de prioridade (heap) ordenada pelo tempo de jogo
+class SpawnDirector:
+    def __init__(self, phase, live_meteors=None):
+        self.phase = phase
+        self.script = WAVE_SCRIPTS.get(phase, WAVE_SCRIPTS[max(WAVE_SCRIPTS)])
+        self.time = 0
+        self.events = []
+        self.seq = 0
+        self.base_sustain = self.scripted_sustain()
+        self.sustain = self.base_sustain
+        self.pending_meteors = 0
+        self.budget = MAX_LIVE_ENTITIES
+        self.spawn_depth = 40
+
+        if live_meteors is None:
+            lo, hi = self.script.get("opening", (0, 0))
+            for _ in range(self.sustain):
+                self.schedule(random.randint(lo, hi), "meteor")
+            pmin, pmax = self.script.get("powerups", (0, 0))
+            wlo, whi = self.script.get("powerup_window", (0, 0))
+            for _ in range(random.randint(pmin, pmax)):
+                self.schedule(random.randint(wlo, whi), "powerup", random_powerup_type())
+            for at, count, spacing in self.script.get("waves", []):
+                for i in range(count):
+                    self.schedule(at + i * spacing, "wave")
+        else:
+            # jogo carregado: so repoe o que faltar para o sustain
+            for _ in range(max(0, self.sustain - live_meteors)):
+                self.schedule_respawn()
+
+    def scripted_sustain(self):
+        if "sustain" in self.script:
+            return self.script["sustain"]
+        return MAX_METEORS_BASE + (self.phase - 1) * MAX_METEORS_INCREMENT
+
+    def sustain_cap(self):
+        if "sustain_max" in self.script:
+            return self.script["sustain_max"]
+        return self.base_sustain + self.script.get("sustain_bonus", 0)
+
+    # config.json recarregada: aplica o novo sustain da fase mantendo o bonus dos powerups
+    def retune(self, live_meteors):
+        base = self.scripted_sustain()
+        if base == self.base_sustain:
+            return
+        self.sustain = max(0, self.sustain + base - self.base_sustain)
+        self.base_sustain = base
+        for _ in range(max(0, self.sustain - live_meteors - self.pending_meteors)):
+            self.schedule_respawn()
+
+    def schedule(self, delay, kind, payload=None):
+        heapq.heappush(self.events, (self.time + delay, self.seq, kind, payload))
+        self.seq += 1
+        if kind == "meteor":
+            self.pending_meteors += 1
+
+    def schedule_respawn(self):
+        lo, hi = self.script.get("respawn", (0, 0))
+        self.schedule(random.randint(lo, hi), "meteor")
+
+    def on_meteor_removed(self, live_meteors):
+        if live_meteors + self.pending_meteors < self.sustain:
+            self.schedule_respawn()
+
+    def on_powerup_pickup(self, live_meteors):
+        if self.sustain < self.sustain_cap():
+            self.sustain += 1
+            self.on_meteor_removed(live_meteors)
+
+    def update(self, dt, meteors, powerups):
+        self.time += dt
+        events = self.events
+        while events and events[0][0] <= self.time:
+            at, seq, kind, payload = heapq.heappop(events)
+            if kind == "meteor":
+                self.pending_meteors -= 1
+            if len(meteors) + len(powerups) >= self.budget:
+                # sem orcamento: tenta de novo um pouco depois
+                self.schedule(BUDGET_RETRY_DELAY, kind, payload)
+                continue
+            x = random.randint(0, WIDTH - 40)
+            y = -random.randint(40, self.spawn_depth)
+            if kind == "meteor" or kind == "wave":
+                meteors.append(Meteor(x, y, meteor_speed_for_phase(self.phase)))
+            else:
+                powerups.append(make_powerup(payload, x, y))
+
+# Modo infinito: a cada ENDLESS_RAMP_INTERVAL o sustain cresce e os meteoros
+# nascem numa faixa bem acima da tela (que o LOD atualiza com menos frequencia)
+class EndlessDirector(SpawnDirector):
+    def __init__(self, live_meteors=None):
+        super().__init__(ENDLESS_PHASE, live_meteors)
+        self.level = 0
+        self.next_ramp = ENDLESS_RAMP_INTERVAL
+        self.budget = ENDLESS_ENTITY_BUDGET
+        self.spawn_depth = ENDLESS_SPAWN_DEPTH
+
+    def update(self, dt, meteors, powerups):
+        if self.time + dt >= self.next_ramp:
+            self.next_ramp += ENDLESS_RAMP_INTERVAL
+            self.level += 1
+            self.sustain = min(ENDLESS_MAX_SUSTAIN, int(self.sustain * ENDLESS_RAMP_FACTOR) + 5)
+            missing = self.sustain - len(meteors) - self.pending_meteors
+            for _ in range(max(0, missing)):
+                self.schedule(random.randint(0, ENDLESS_RAMP_INTERVAL // 2), "meteor")
+            for _ in range(random.randint(1, 3)):
+                self.schedule(random.randint(0, ENDLESS_RAMP_INTERVAL), "powerup", random_powerup_type())
+        super().update(dt, meteors, powerups)
+
+def make_director(phase, live_meteors=None):
+    if phase == ENDLESS_PHASE:
+        return EndlessDirector(live_meteors)
+    return SpawnDirector(phase, live_meteors)
+
+# ----------------------------------------------------------
+# LOD / ESTATISTICAS
+# ----------------------------------------------------------
+# Desce um nivel de qualidade quando o tempo medio de frame fica alto por
+# QUALITY_DEGRADE_FRAMES frames e sobe de novo so depois de QUALITY_RECOVER_FRAMES
+# frames folgados (histerese), respeitando QUALITY_COOLDOWN entre trocas.
+class QualityGovernor:
+    def __init__(self, target_ms=1000.0 / FPS):
+        self.target_ms = target_ms
+        self.avg_ms = 0.0
+        self.tier = 0
+        self.over = 0
+        self.under = 0
+        self.last_change = pygame.time.get_ticks()
+        self.changes = []
+
+    def update(self, work_ms):
+        self.avg_ms += (work_ms - self.avg_ms) * 0.05
+        if self.avg_ms > self.target_ms * QUALITY_DEGRADE_AT:
+            self.over += 1
+            self.under = 0
+        elif self.avg_ms < self.target_ms * QUALITY_RECOVER_AT:
+            self.under += 1
+            self.over = 0
+        else:
+            self.over = self.under = 0
+
+        now = pygame.time.get_ticks()
+        if now - self.last_change < QUALITY_COOLDOWN:
+            return
+        if self.over >= QUALITY_DEGRADE_FRAMES and self.tier < len(QUALITY_TIERS) - 1:
+            self.set_tier(self.tier + 1, now)
+        elif self.under >= QUALITY_RECOVER_FRAMES and self.tier > 0:
+            self.set_tier(self.tier - 1, now)
+
+    def set_tier(self, tier, now):
+        print(f"Qualidade: {QUALITY_TIERS[self.tier]} -> {QUALITY_TIERS[tier]} (frame medio {self.avg_ms:.1f}ms)")
+        self.changes.append((now, self.tier, tier, round(self.avg_ms, 2)))
+        self.tier = tier
+        self.last_change = now
+        self.over = self.under = 0
+
+    def flat_background(self): return self.tier >= 1
+    def engine_slowdown(self): return 3 if self.tier >= 2 else 1
+    def particle_fraction(self): return 0.35 if self.tier >= 3 else 1.0
+
+    def lod_interval(self):
+        return min(LOD_MAX_INTERVAL, LOD_BASE_INTERVAL * (1 + self.tier))
+
+# Contadores por minuto para ver quando o motor satura
+class ThroughputStats:
+    def __init__(self, period=STATS_PERIOD):
+        self.period = period
+        self.history = []
+        self.reset(pygame.time.get_ticks())
+
+    def reset(self, now):
+        self.start = now
+        self.frames = 0
+        self.work_ms = 0
+        self.max_work_ms = 0
+        self.updated = 0
+        self.lod_skipped = 0
+        self.drawn = 0
+        self.culled = 0
+        self.skipped = 0
+        self.peak_entities = 0
+
+    def end_frame(self, now, work_ms, live_entities):
+        self.frames += 1
+        self.work_ms += work_ms
+        self.max_work_ms = max(self.max_work_ms, work_ms)
+        self.peak_entities = max(self.peak_entities, live_entities)
+        if now - self.start >= self.period:
+            self.flush(now)
+
+    def flush(self, now):
+        if not self.frames:
+            return
+        secs = max(0.001, (now - self.start) / 1000.0)
+        rec = {
+            "minute": len(self.history) + 1,
+            "fps": round(self.frames / secs, 1),
+            "avg_work_ms": round(self.work_ms / self.frames, 2),
+            "max_work_ms": round(self.max_work_ms, 2),
+            "updates_per_s": int(self.updated / secs),
+            "lod_skipped_per_s": int(self.lod_skipped / secs),
+            "draws_per_s": int(self.drawn / secs),
+            "culled_per_s": int(self.culled / secs),
+            "frames_skipped": self.skipped,
+            "peak_entities": self.peak_entities,
+        }
+        self.history.append(rec)
+        print("Stats:", json.dumps(rec))
+        self.reset(now)
+
+# ----------------------------------------------------------
+# RITMO DE FRAMES (FRAME-SKIP)
+# ----------------------------------------------------------
+# Passo fixo de simulacao: cada volta do loop e um tick de 1000/FPS ms.
+# Se o frame nao vai caber no prazo, pula so o desenho (nunca a simulacao),
+# no maximo MAX_FRAME_SKIP vezes seguidas.
+class FrameGovernor:
+    def __init__(self, fps=FPS, max_skip=MAX_FRAME_SKIP):
+        self.frame_ms = 1000.0 / fps
+        self.max_skip = max_skip
+        self.next_start = self.now_ms()
+        self.deadline = self.next_start + self.frame_ms
+        self.tick_start = self.next_start
+        self.update_ms = 0.0
+        self.render_ms = 0.0
+        self.work_ms = 0.0
+        self.cpu_ms = 0.0
+        self.last_update_ms = 0.0
+        self.consecutive_skips = 0
+        self.skipped_total = 0
+        self.skip_times = deque()
+
+    def now_ms(self):
+        return time.perf_counter() * 1000.0
+
+    def tick(self):
+        now = self.now_ms()
+        if now < self.next_start:
+            time.sleep((self.next_start - now) / 1000.0)
+            now = self.now_ms()
+        elif now - self.next_start > self.frame_ms * (self.max_skip + 1):
+            # atrasado demais para recuperar: reancora o relogio
+            self.next_start = now
+        self.tick_start = now
+        self.deadline = self.next_start + self.frame_ms
+        self.next_start += self.frame_ms
+        return self.frame_ms
+
+    def update_done(self):
+        self.last_update_ms = self.now_ms() - self.tick_start
+        self.update_ms += (self.last_update_ms - self.update_ms) * 0.1
+
+    def should_render(self):
+        now = self.now_ms()
+        # o desenho terminaria depois do prazo do tick seguinte: nao ha como absorver o atraso
+        late_ms = now + self.render_ms - self.deadline
+        if late_ms > self.frame_ms and self.consecutive_skips < self.max_skip:
+            self.consecutive_skips += 1
+            self.skipped_total += 1
+            self.skip_times.append(now)
+            self.trim_skips(now)
+            return False
+        self.consecutive_skips = 0
+        self.render_start = now
+        return True
+
+    def render_done(self):
+        last_render_ms = self.now_ms() - self.render_start
+        self.render_ms += (last_render_ms - self.render_ms) * 0.1
+        self.work_ms = self.last_update_ms + last_render_ms
+
+    def draw_done(self):
+        self.cpu_ms = self.last_update_ms + self.now_ms() - self.render_start
+
+    # so guarda os pulos do ultimo segundo, com ou sem o HUD ligado
+    def trim_skips(self, now):
+        cutoff = now - 1000.0
+        while self.skip_times and self.skip_times[0] < cutoff:
+            self.skip_times.popleft()
+
+    def skips_last_second(self):
+        self.trim_skips(self.now_ms())
+        return len(self.skip_times)
+
+# ----------------------------------------------------------
+# TELEMETRIA
+# ----------------------------------------------------------
+TELEMETRY_QUEUE_SIZE = 4096
+TELEMETRY_BATCH = 256
+TELEMETRY_FLUSH_INTERVAL = 1.0
+TELEMETRY_MAX_BYTES = 5 * 1024 * 1024
+TELEMETRY_BACKUPS = 3
+TELEMETRY_FRAME_SUMMARY = 10000
+
+# emit() so poe uma tupla no buffer (deque.append e atomico, sem lock);
+# a serializacao e a escrita ficam na thread de fundo. Buffer cheio descarta
+# o evento (e conta) em vez de travar o frame.
+class Telemetry:
+    def __init__(self, path=TELEMETRY_FILE, enabled=TELEMETRY):
+        self.enabled = enabled
+        self.path = path
+        self.buffer = deque()
+        self.dropped = 0
+        self.emitted = 0
+        self.emit_ns = 0
+        self.session = int(time.time())
+        self.stop = threading.Event()
+        self.thread = None
+        if enabled:
+            self.thread = threading.Thread(target=self.flusher, name="telemetria", daemon=True)
+            self.thread.start()
+            atexit.register(self.close)
+
+    def emit(self, event, **fields):
+        if not self.enabled:
+            return
+        t0 = time.perf_counter_ns()
+        if len(self.buffer) >= TELEMETRY_QUEUE_SIZE:
+            self.dropped += 1
+        else:
+            self.buffer.append((time.time(), event, fields))
+        self.emitted += 1
+        self.emit_ns += time.perf_counter_ns() - t0
+
+    def emit_cost_us(self):
+        return self.emit_ns / 1000.0 / self.emitted if self.emitted else 0.0
+
+    def flusher(self):
+        while not self.stop.wait(TELEMETRY_FLUSH_INTERVAL):
+            self.drain()
+        self.drain()
+
+    def drain(self):
+        batch = []
+        buf = self.buffer
+        while buf:
+            batch.append(buf.popleft())
+            if len(batch) >= TELEMETRY_BATCH:
+                self.write(batch)
+                batch = []
+        if batch:
+            self.write(batch)
+
+    def write(self, batch):
+        lines = []
+        for ts, event, fields in batch:
+            rec = {"t": round(ts, 3), "session": self.session, "event": event}
+            rec.update(fields)
+            lines.append(json.dumps(rec, ensure_ascii=False))
+        try:
+            self.rotate_if_needed()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except Exception as e:
+            print("Erro ao gravar telemetria:", e)
+
+    def rotate_if_needed(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < TELEMETRY_MAX_BYTES:
+            return
+        for i in range(TELEMETRY_BACKUPS - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def close(self):
+        if not self.thread or not self.thread.is_alive():
+            return
+        self.emit("telemetry_closed", dropped=self.dropped, emit_us=round(self.emit_cost_us(), 3))
+        self.stop.set()
+        self.thread.join(timeout=2.0)
+
+telemetry = Telemetry()
+
+def summarize_frames(samples):
+    if not samples:
+        return {"frames": 0}
+    ordered = sorted(samples)
+    return {
+        "frames": len(ordered),
+        "avg_ms": round(sum(ordered) / len(ordered), 2),
+        "p50_ms": round(ordered[len(ordered) // 2], 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+def emit_phase_end(phase, started_at, score, shots_fired, shots_hit, reason):
+    telemetry.emit("phase_end", phase=phase, reason=reason, score=score,
+                   duration_ms=game_clock.now() - started_at,
+                   shots_fired=shots_fired, shots_hit=shots_hit,
+                   hit_ratio=round(shots_hit / shots_fired, 3) if shots_fired else 0.0)
+
+# ----------------------------------------------------------
+# METRICAS (Prometheus em 127.0.0.1:SPACE_METRICS_PORT/metrics)
+# ----------------------------------------------------------
+METRICS_FRAME_WINDOW = 256
+METRICS_MIXER_SAMPLE = 30
+METRICS_STALE_MS = 2000
+
+def current_rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+# A cena de jogo so faz atribuicoes simples nestes campos (atomicas sob o GIL);
+# a thread do servidor le sem lock e monta o texto fora do frame.
+class GameMetrics:
+    def __init__(self):
+        self.frame_ms = array("d", [0.0] * METRICS_FRAME_WINDOW)
+        self.frame_index = 0
+        self.frames_total = 0
+        self.last_present = 0.0
+        self.frames_skipped = 0
+        self.phase = 0
+        self.meteors = 0
+        self.powerups = 0
+        self.bullets = 0
+        self.boss_projectiles = 0
+        self.mixer_busy = 0
+        self.mixer_channels = 0
+        self.quality_tier = 0
+
+    def frame_presented(self):
+        now = time.perf_counter()
+        if self.last_present:
+            self.frame_ms[self.frame_index % METRICS_FRAME_WINDOW] = (now - self.last_present) * 1000.0
+            self.frame_index += 1
+        self.last_present = now
+        self.frames_total += 1
+
+    # fora da cena de jogo os gauges voltam ao estado de menu
+    def leave_play(self):
+        self.phase = 0
+        self.meteors = 0
+        self.powerups = 0
+        self.bullets = 0
+        self.boss_projectiles = 0
+        self.quality_tier = 0
+
+    def sample_mixer(self):
+        try:
+            channels = pygame.mixer.get_num_channels()
+            self.mixer_busy = sum(1 for i in range(channels) if pygame.mixer.Channel(i).get_busy())
+            self.mixer_channels = channels
+        except pygame.error:
+            pass
+
+    def render(self):
+        count = min(self.frame_index, METRICS_FRAME_WINDOW)
+        window = sorted(self.frame_ms[:count]) if count < METRICS_FRAME_WINDOW else sorted(self.frame_ms)
+        mean = sum(window) / len(window) if window else 0.0
+        # menus so apresentam quando algo muda: sem frame recente o fps e 0
+        if (time.perf_counter() - self.last_present) * 1000.0 > METRICS_STALE_MS:
+            mean = 0.0
+        lines = []
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP spaceescape_{name} {help_text}")
+            lines.append(f"# TYPE spaceescape_{name} {kind}")
+            for labels, value in samples:
+                lines.append(f"spaceescape_{name}{labels} {value}")
+        metric("fps", "gauge", "Frames presented per second over the recent window.",
+               [("", round(1000.0 / mean, 2) if mean else 0)])
+        quantiles = []
+        for q in (0.5, 0.9, 0.99):
+            value = window[min(len(window) - 1, int(q * len(window)))] if window else 0
+            quantiles.append((f'{{quantile="{q}"}}', round(value, 3)))
+        quantiles.append(("_sum", round(sum(window), 3)))
+        quantiles.append(("_count", len(window)))
+        metric("frame_time_ms", "summary", "Time between presented frames in milliseconds.", quantiles)
+        metric("frames_total", "counter", "Frames presented.", [("", self.frames_total)])
+        metric("frames_skipped_total", "counter", "Renders skipped by the frame governor.", [("", self.frames_skipped)])
+        metric("entities", "gauge", "Live entities by kind.", [
+            ('{kind="meteor"}', self.meteors), ('{kind="powerup"}', self.powerups),
+            ('{kind="bullet"}', self.bullets), ('{kind="boss_projectile"}', self.boss_projectiles)])
+        metric("mixer_channels_busy", "gauge", "Mixer channels currently playing.", [("", self.mixer_busy)])
+        metric("mixer_channels", "gauge", "Mixer channels allocated.", [("", self.mixer_channels)])
+        rss = current_rss_bytes()
+        if rss is not None:
+            metric("rss_bytes", "gauge", "Resident set size of the game process.", [("", rss)])
+        metric("gc_collections_total", "counter", "Garbage collections by generation.",
+               [(f'{{generation="{i}"}}', st["collections"]) for i, st in enumerate(gc.get_stats())])
+        metric("phase", "gauge", "Current phase (0 = menu).", [("", self.phase)])
+        metric("quality_tier", "gauge", "Current visual quality tier (0 = full).", [("", self.quality_tier)])
+        return "\n".join(lines) + "\n"
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = game_metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_metrics_server(port):
+    try:
+        server = HTTPServer(("127.0.0.1", port), MetricsHandler)
+    except OSError as e:
+        print("Erro ao abrir servidor de metricas:", e)
+        return None
+    threading.Thread(target=server.serve_forever, name="metricas", daemon=True).start()
+    return server
+
+game_metrics = GameMetrics() if METRICS_PORT else None
+if game_metrics:
+    start_metrics_server(METRICS_PORT)
+
+# ----------------------------------------------------------
+# ALOCACOES E GC (SPACE_ALLOC_TRACE=1, SPACE_GC_THRESHOLD=a,b,c, SPACE_GC_FREEZE=1)
+# ----------------------------------------------------------
+ALLOC_REPORT_MS = 1000
+ALLOC_TOP_LINES = 8
+ALLOC_IGNORE = (tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<unknown>"))
+
+# O loop marca a etapa corrente com stage(); cada etapa acumula o saldo de
+# bytes (o que ficou vivo) e o pico acima da entrada (temporarios que
+# morreram dentro dela). As pausas do gc.callbacks vao para a etapa em que a
+# coleta disparou. A cada ALLOC_REPORT_MS imprime a tabela e as linhas que
+# mais cresceram desde o snapshot anterior.
+class AllocTracker:
+    def __init__(self):
+        tracemalloc.start(1)
+        self.current = None
+        self.entry_bytes = 0
+        self.frames = 0
+        self.net = {}
+        self.peak = {}
+        self.gc_ms = {}
+        self.collections = [0, 0, 0]
+        self.gc_max_ms = 0.0
+        self.gc_max_stage = None
+        self.gc_start = None
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(ALLOC_IGNORE)
+        self.last_report = time.perf_counter()
+        gc.callbacks.append(self.on_gc)
+
+    def stage(self, name):
+        self.end_stage()
+        self.current = name
+        tracemalloc.reset_peak()
+        self.entry_bytes = tracemalloc.get_traced_memory()[0]
+
+    def end_stage(self):
+        name = self.current
+        if name is None:
+            return
+        size, peak = tracemalloc.get_traced_memory()
+        self.net[name] = self.net.get(name, 0) + size - self.entry_bytes
+        self.peak[name] = max(self.peak.get(name, 0), peak - self.entry_bytes)
+        self.current = None
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.gc_start = time.perf_counter()
+            return
+        if self.gc_start is None:
+            return
+        ms = (time.perf_counter() - self.gc_start) * 1000.0
+        self.gc_start = None
+        name = self.current or "fora"
+        self.gc_ms[name] = self.gc_ms.get(name, 0.0) + ms
+        self.collections[info["generation"]] += 1
+        if ms > self.gc_max_ms:
+            self.gc_max_ms = ms
+            self.gc_max_stage = name
+
+    def frame_done(self):
+        self.end_stage()
+        self.frames += 1
+        now = time.perf_counter()
+        if (now - self.last_report) * 1000.0 >= ALLOC_REPORT_MS:
+            self.report()
+            self.last_report = time.perf_counter()
+
+    def report(self):
+        frames = max(1, self.frames)
+        g0, g1, g2 = self.collections
+        print(f"[alloc] {self.frames} frames  gc: {g0}/{g1}/{g2} coletas (g0/g1/g2), "
+              f"pior {self.gc_max_ms:.2f}ms em {self.gc_max_stage or '-'}")
+        print(f"  {'etapa':<12} {'saldo B/frame':>14} {'pico KiB':>9} {'gc ms':>7}")
+        for name in sorted(set(self.net) | set(self.gc_ms), key=lambda n: -self.peak.get(n, 0)):
+            print(f"  {name:<12} {self.net.get(name, 0) / frames:>14.1f} {self.peak.get(name, 0) / 1024:>9.1f} {self.gc_ms.get(name, 0.0):>7.2f}")
+        snapshot = tracemalloc.take_snapshot().filter_traces(ALLOC_IGNORE)
+        top = [st for st in snapshot.compare_to(self.snapshot, "lineno") if st.size_diff > 0][:ALLOC_TOP_LINES]
+        for st in top:
+            frame = st.traceback[0]
+            print(f"    {os.path.basename(frame.filename)}:{frame.lineno}  +{st.size_diff / 1024:.1f} KiB  +{st.count_diff} blocos")
+        self.snapshot = snapshot
+        self.frames = 0
+        self.net.clear()
+        self.peak.clear()
+        self.gc_ms.clear()
+        self.collections = [0, 0, 0]
+        self.gc_max_ms = 0.0
+        self.gc_max_stage = None
+
+# Ajustes do coletor antes do loop. Limiares maiores espacam as coletas da
+# geracao 0; gc.freeze tira do coletor tudo o que ja existe (assets, tabelas),
+# entao cada coleta so percorre o que a partida criou.
+def tune_gc():
+    if GC_THRESHOLD:
+        try:
+            gc.set_threshold(*[int(x) for x in GC_THRESHOLD.split(",")])
+        except (ValueError, TypeError) as e:
+            print("SPACE_GC_THRESHOLD invalido:", e)
+    if GC_FREEZE:
+        gc.collect()
+        gc.freeze()
+    if GC_THRESHOLD or GC_FREEZE:
+        print("GC: limiares", gc.get_threshold(), "objetos congelados", gc.get_freeze_count())
+
+alloc_tracker = AllocTracker() if ALLOC_TRACE else None
+
+# ----------------------------------------------------------
+# REPLAY INSTANTANEO (F5 salva os ultimos SPACE_REPLAY segundos)
+# ----------------------------------------------------------
+REPLAY_DIR = "replays"
+
+# Nome do formato de pixel para o ffmpeg (-pix_fmt) a partir das mascaras
+def ffmpeg_pix_fmt(surf):
+    if surf.get_bytesize() != 4:
+        return None
+    names = ["0"] * 4
+    for ch, mask, shift in zip("rgba", surf.get_masks(), surf.get_shifts()):
+        if mask:
+            names[shift // 8] = ch
+    if sys.byteorder == "big":
+        names.reverse()
+    return "".join(names)
+
+# Anel de quadros num unico bytearray alocado no inicio. O quadro apresentado
+# e reduzido numa superficie fixa e copiado pelo buffer dela direto para o
+# anel; a gravacao em disco roda numa thread e a captura fica parada enquanto
+# ela le o anel.
+class ReplayBuffer:
+    def __init__(self, seconds, scale=2, fps=30):
+        self.size = (WIDTH // scale, HEIGHT // scale)
+        self.frame = pygame.Surface(self.size).convert()
+        self.encode_surf = self.frame.copy()
+        self.frame_bytes = self.frame.get_pitch() * self.size[1]
+        self.capacity = max(1, seconds * fps)
+        self.ring = bytearray(self.frame_bytes * self.capacity)
+        self.ring_view = memoryview(self.ring)
+        self.fps = fps
+        self.interval = 1.0 / fps
+        self.scale = scale
+        self.head = 0
+        self.filled = 0
+        self.next_capture = 0.0
+        self.saving = False
+        self.worker = None
+        self.capture_ms = 0.0
+        self.captures = 0
+        print(f"Replay: {seconds}s a {fps} fps, {self.size[0]}x{self.size[1]}, {len(self.ring) // (1024*1024)} MB")
+
+    def capture(self, surf):
+        now = time.perf_counter()
+        if self.saving or now < self.next_capture:
+            return
+        self.next_capture = max(self.next_capture + self.interval, now)
+        if self.scale > 1:
+            pygame.transform.scale(surf, self.size, self.frame)
+        else:
+            self.frame.blit(surf, (0, 0))
+        off = self.head * self.frame_bytes
+        self.ring_view[off:off + self.frame_bytes] = self.frame.get_buffer()
+        self.head = (self.head + 1) % self.capacity
+        self.filled = min(self.filled + 1, self.capacity)
+        self.capture_ms += (time.perf_counter() - now) * 1000.0
+        self.captures += 1
+
+    def save(self, fmt=REPLAY_FORMAT):
+        if self.saving or not self.filled:
+            return False
+        self.saving = True
+        count = self.filled
+        start = (self.head - count) % self.capacity
+        self.worker = threading.Thread(target=self.encode, args=(fmt, start, count), name="replay", daemon=True)
+        self.worker.start()
+        return True
+
+    def wait(self):
+        if self.worker:
+            self.worker.join()
+
+    def frames_in_order(self, start, count):
+        for i in range(count):
+            off = ((start + i) % self.capacity) * self.frame_bytes
+            yield self.ring_view[off:off + self.frame_bytes]
+
+    def encode(self, fmt, start, count):
+        t0 = time.perf_counter()
+        base = os.path.join(REPLAY_DIR, f"replay_{int(time.time())}")
+        try:
+            os.makedirs(REPLAY_DIR, exist_ok=True)
+            if fmt == "png":
+                os.makedirs(base, exist_ok=True)
+                for i, data in enumerate(self.frames_in_order(start, count)):
+                    self.encode_surf.get_buffer().write(bytes(data))
+                    pygame.image.save(self.encode_surf, os.path.join(base, f"frame_{i:05d}.png"))
+                path = base
+            else:
+                path = base + ".raw"
+                with open(path, "wb") as f:
+                    for data in self.frames_in_order(start, count):
+                        f.write(data)
+                save_json(base + ".json", {"width": self.size[0], "height": self.size[1], "fps": self.fps, "frames": count,
+                                           "pix_fmt": ffmpeg_pix_fmt(self.frame), "stride": self.frame.get_pitch()})
+            avg = self.capture_ms / self.captures if self.captures else 0.0
+            print(f"Replay salvo: {path} ({count} quadros, {time.perf_counter() - t0:.1f}s, captura media {avg:.3f} ms)")
+        except (OSError, pygame.error) as e:
+            print("Erro ao salvar replay:", e)
+        finally:
+            self.saving = False
+
+replay = ReplayBuffer(REPLAY_SECONDS, REPLAY_SCALE, REPLAY_FPS) if REPLAY_SECONDS > 0 else None
+
+# ----------------------------------------------------------
+# HOT RELOAD (SPACE_HOT_RELOAD=1)
+# ----------------------------------------------------------
+HOT_RELOAD_INTERVAL = 0.5
+
+# Thread que so compara mtimes; quem carrega e troca os dados e a cena de jogo,
+# entre dois ticks, com apply_hot_reload.
+class AssetWatcher:
+    def __init__(self, paths, interval=HOT_RELOAD_INTERVAL):
+        self.interval = interval
+        self.mtimes = {path: self.mtime(path) for path in paths}
+        self.changed = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        threading.Thread(target=self.run, name="hot-reload", daemon=True).start()
+
+    @staticmethod
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            for path, old in self.mtimes.items():
+                new = self.mtime(path)
+                if new != old:
+                    self.mtimes[path] = new
+                    with self.lock:
+                        self.changed.add(path)
+
+    def take_changes(self):
+        if not self.changed:
+            return ()
+        with self.lock:
+            changed, self.changed = self.changed, set()
+        return changed
+
+def apply_tuning(values):
+    PHASE_TARGETS.clear()
+    PHASE_TARGETS.update(values["PHASE_TARGETS"])
+    module = globals()
+    for key, val in values.items():
+        if key != "PHASE_TARGETS":
+            module[key] = val
+    TUNING.update(values)
+    normal = METEOR_TYPES[METEOR_NORMAL]
+    METEOR_TYPES[METEOR_NORMAL] = normal._replace(speed_range=(normal.speed_range[0], METEOR_MAX_SPEED))
+
+# Refaz so o que foi derivado das imagens trocadas
+def refresh_image_caches(keys):
+    for table in (POWERUP_TYPES, METEOR_TYPES):
+        for i, t in enumerate(table):
+            if t.image_key in keys:
+                image = IMAGES.get(t.image_key)
+                table[i] = t._replace(image=image, mask=sprite_mask(image, t.size))
+    for number in (1, 2):
+        key = f"player{number}"
+        if key in keys:
+            PLAYER_SPRITES[number] = (IMAGES[key], sprite_mask(IMAGES[key]))
+    for key in keys:
+        BG_FLAT_COLORS.pop(key, None)
+    if "shield" in keys:
+        SHIELD_SPRITES.clear()
+    if "boss_sprite" in keys:
+        DEMO_BOSS_SPRITE.clear()
+
+# Devolve (chaves de imagem trocadas, se a config mudou)
+def apply_hot_reload(paths):
+    image_keys = set()
+    tuning_changed = False
+    for path in paths:
+        if path == TUNING_FILE:
+            values = read_tuning(TUNING)
+            if values is None:
+                print("Mantendo a configuracao atual")
+                continue
+            apply_tuning(values)
+            tuning_changed = True
+        for key, filename in ASSETS.items():
+            if filename == path:
+                IMAGES[key] = load_registered_image(key)
+                image_keys.add(key)
+        for key, filename in AUDIO_ASSETS.items():
+            if filename == path:
+                SOUNDS[key] = load_sound(filename)
+        print("Recarregado:", path)
+    refresh_image_caches(image_keys)
+    return image_keys, tuning_changed
+
+asset_watcher = AssetWatcher([TUNING_FILE] + list(ASSETS.values()) + list(AUDIO_ASSETS.values())) if HOT_RELOAD else None
+
+# ----------------------------------------------------------
+# SAVE/LOAD/HIGHSCORES
+# ----------------------------------------------------------
+def make_save_state(phase, phase_score, players, meteors, powerups, boss, phase_timer_start, player2_active, mouse_control):
+    state = {
+        "phase": phase,
+        "phase_score": phase_score,
+        "player2_active": player2_active,
+        "mouse_control": mouse_control,
+        "phase_timer_start": phase_timer_start,
+        "players": [],
+        "meteors": [],
+        "powerups": [],
+        "boss": None
+    }
+    for p in players:
+        if p:
+            pl = {
+                "number": p.number,
+                "x": p.rect.x,
+                "y": p.rect.y,
+                "lives": p.lives,
+                "shot_level": p.shot_level,
+                "inv_rem": max(0, p.invulnerable_until - game_clock.now())
+            }
+            state["players"].append(pl)
+    for m in meteors:
+        state["meteors"].append({"x": m.rect.x, "y": m.rect.y, "speed": m.speed})
+    for pu in powerups:
+        state["powerups"].append({"x": pu.rect.x, "y": pu.rect.y, "type": POWERUP_TYPES[pu.kind].name})
+    if boss:
+        state["boss"] = {
+            "hp_left": boss.hp_left,
+            "hp_core": boss.hp_core,
+            "hp_right": boss.hp_right
+        }
+    return state
+
+def restore_save_state(s):
+    phase = s.get("phase", 1)
+    phase_score = s.get("phase_score", 0)
+    player_objs = [None, None]
+    for pd in s.get("players", []):
+        num = pd.get("number", 1)
+        p = Player(num, pd.get("x", WIDTH//2), pd.get("y", HEIGHT-60))
+        p.lives = pd.get("lives", PLAYER_START_LIVES)
+        p.shot_level = pd.get("shot_level", 1)
+        inv_rem = pd.get("inv_rem", 0)
+        if inv_rem > 0:
+            p.invulnerable_until = game_clock.now() + inv_rem
+        player_objs[num-1] = p
+    meteors = []
+    for md in s.get("meteors", []):
+        m = Meteor(md.get("x",0), md.get("y",-50), md.get("speed",4))
+        meteors.append(m)
+    powerups = []
+    for pud in s.get("powerups", []):
+        x, y = pud.get("x",0), pud.get("y",-100)
+        powerups.append(make_powerup(POWERUP_KIND_BY_NAME.get(pud.get("type", "life"), POWERUP_TP), x, y))
+    boss = None
+    if s.get("boss"):
+        boss = Boss(WIDTH//2, HEIGHT//3)
+        boss.hp_left = s["boss"].get("hp_left", boss.max_left)
+        boss.hp_core = s["boss"].get("hp_core", boss.max_core)
+        boss.hp_right = s["boss"].get("hp_right", boss.max_right)
+    return phase, phase_score, player_objs, meteors, powerups, boss, s.get("phase_timer_start", None), s.get("player2_active", False), s.get("mouse_control", False)
+
+def load_highscores():
+    data = load_json(HIGHSCORE_FILE)
+    if not data:
+        return []
+    return data
+
+def save_highscores(lst):
+    save_json(HIGHSCORE_FILE, lst)
+
+def add_highscore(name, score):
+    scores = load_highscores()
+    scores.append({"name": name, "score": score})
+    scores = sorted(scores, key=lambda s: s["score"], reverse=True)[:TOP_SCORES]
+    save_highscores(scores)
+
+# ----------------------------------------------------------
+# REWIND (SPACE_REWIND=<segundos>, segure R para voltar)
+# ----------------------------------------------------------
+REWIND_KEYFRAME_EVERY = 30
+REWIND_SPEED = 2
+EVENT_KINDS = ("meteor", "powerup", "wave")
+
+# Estado de um tick achatado num array('d') de layout fixo:
+#   cabecalho | 2 jogadores (+ tiros) | meteoros | powerups | boss | director
+# Tempos absolutos viram tempo relativo a "now". O RNG nao e salvo: cada tick
+# comeca com random.seed(base + tick), entao basta guardar o numero do tick.
+def pack_tick_state(tick, now, phase, phase_score, phase_start_time, shots_fired, shots_hit,
+                    players, meteors, powerups, boss, director):
+    out = [tick, phase, phase_score, now - phase_start_time, shots_fired, shots_hit, len(meteors), len(powerups)]
+    for p in players:
+        if p:
+            out += (1, p.rect.x, p.rect.y, p.lives, max(0, p.invulnerable_until - now), p.shot_level, p.max_bullets, len(p.bullets))
+            for b in p.bullets:
+                out += (b.rect.x, b.rect.y, b.vx, b.vy)
+        else:
+            out.append(0)
+    for m in meteors:
+        out += (m.rect.x, m.rect.y, m.speed, m.kind)
+    for pu in powerups:
+        out += (pu.rect.x, pu.rect.y, pu.kind)
+    if boss:
+        out += (1, boss.rect.x, boss.rect.y, boss.hp_left, boss.hp_core, boss.hp_right, now - boss.last_shot,
+                boss.shoot_delay, len(boss.projectiles))
+        for proj in boss.projectiles:
+            out += (proj.rect.x, proj.rect.y, proj.vx, proj.vy)
+    else:
+        out.append(0)
+    out += (director.time, director.seq, director.sustain, director.pending_meteors,
+            getattr(director, "level", 0), getattr(director, "next_ramp", 0), len(director.events))
+    for at, seq, kind, payload in director.events:
+        out += (at, seq, EVENT_KINDS.index(kind), -1 if payload is None else payload)
+    return array("d", out)
+
+# Recria o estado; reaproveita os objetos de jogador e o boss que existirem
+def unpack_tick_state(data, now, players, boss):
+    v = [int(x) if x == int(x) else x for x in data]
+    tick, phase, phase_score, phase_elapsed, shots_fired, shots_hit, n_meteors, n_powerups = v[:8]
+    i = 8
+    for slot in (0, 1):
+        present = v[i]
+        i += 1
+        if not present:
+            players[slot] = None
+            continue
+        x, y, lives, inv_rem, shot_level, max_bullets, n_bullets = v[i:i + 7]
+        i += 7
+        p = players[slot] or Player(slot + 1, 0, 0)
+        p.rect.x, p.rect.y = x, y
+        p.lives, p.shot_level, p.max_bullets = lives, shot_level, max_bullets
+        p.invulnerable_until = now + inv_rem
+        p.bullets = [Projectile(v[j], v[j+1], v[j+2], v[j+3], p.number) for j in range(i, i + 4 * n_bullets, 4)]
+        i += 4 * n_bullets
+        players[slot] = p
+    meteors = [Meteor(v[j], v[j+1], v[j+2], v[j+3]) for j in range(i, i + 4 * n_meteors, 4)]
+    i += 4 * n_meteors
+    powerups = [Powerup(v[j], v[j+1], v[j+2]) for j in range(i, i + 3 * n_powerups, 3)]
+    i += 3 * n_powerups
+    if v[i]:
+        x, y, hp_left, hp_core, hp_right, shot_elapsed, shoot_delay, n_proj = v[i+1:i+9]
+        i += 9
+        boss = boss or Boss(WIDTH//2, HEIGHT//3)
+        boss.rect.x, boss.rect.y = x, y
+        boss.hp_left, boss.hp_core, boss.hp_right = hp_left, hp_core, hp_right
+        boss.last_shot = now - shot_elapsed
+        boss.shoot_delay = shoot_delay
+        boss.projectiles = [Projectile(v[j], v[j+1], v[j+2], v[j+3], "boss") for j in range(i, i + 4 * n_proj, 4)]
+        i += 4 * n_proj
+    else:
+        boss = None
+        i += 1
+    d_time, d_seq, sustain, pending, level, next_ramp, n_events = v[i:i + 7]
+    i += 7
+    # com live_meteors = sustain o director nao agenda nada nem usa o RNG
+    director = make_director(phase, live_meteors=sustain)
+    director.time, director.seq, director.sustain, director.pending_meteors = d_time, d_seq, sustain, pending
+    if phase == ENDLESS_PHASE:
+        director.level, director.next_ramp = level, next_ramp
+    director.events = [(v[j], v[j+1], EVENT_KINDS[v[j+2]], None if v[j+3] < 0 else v[j+3]) for j in range(i, i + 4 * n_events, 4)]
+    return tick, phase, phase_score, now - phase_elapsed, shots_fired, shots_hit, meteors, powerups, boss, director
+
+# Anel de snapshots: um quadro-chave completo a cada REWIND_KEYFRAME_EVERY
+# ticks e, entre eles, so os indices/valores que mudaram desde o tick anterior.
+class RewindBuffer:
+    def __init__(self, seconds, fps=FPS):
+        self.entries = deque(maxlen=max(REWIND_KEYFRAME_EVERY, seconds * fps))
+        self.seed_base = random.randrange(1 << 30)
+        self.tick = 0
+        self.last = None
+        self.cursor = None
+        self.capture_ms = 0.0
+
+    def seed_tick(self):
+        self.tick += 1
+        random.seed(self.seed_base + self.tick)
+
+    def capture(self, now, *state):
+        t0 = time.perf_counter()
+        cur = pack_tick_state(self.tick, now, *state)
+        prev = self.last
+        delta = None
+        if prev is not None and len(prev) == len(cur) and self.tick % REWIND_KEYFRAME_EVERY:
+            delta = array("d")
+            for i, (a, b) in enumerate(zip(prev, cur)):
+                if a != b:
+                    delta.append(i)
+                    delta.append(b)
+            if len(delta) > len(cur):
+                delta = None
+        self.entries.append((delta is None, cur if delta is None else delta))
+        self.last = cur
+        self.capture_ms = (time.perf_counter() - t0) * 1000.0
+
+    # Primeiro indice reconstruivel (o anel pode ter comido o quadro-chave)
+    def oldest(self):
+        for i, (key, _) in enumerate(self.entries):
+            if key:
+                return i
+        return len(self.entries)
+
+    def state_at(self, index):
+        k = index
+        while not self.entries[k][0]:
+            k -= 1
+        state = array("d", self.entries[k][1])
+        for k in range(k + 1, index + 1):
+            delta = self.entries[k][1]
+            for j in range(0, len(delta), 2):
+                state[int(delta[j])] = delta[j + 1]
+        return state
+
+    # Volta REWIND_SPEED ticks; devolve o estado desempacotado ou None
+    def step_back(self, now, players, boss):
+        if not self.entries:
+            return None
+        if self.cursor is None:
+            self.cursor = len(self.entries) - 1
+        self.cursor = max(self.oldest(), self.cursor - REWIND_SPEED)
+        if self.cursor >= len(self.entries):
+            return None
+        return unpack_tick_state(self.state_at(self.cursor), now, players, boss)
+
+    # Solta a tecla: descarta o futuro e segue a partir do cursor
+    def resume(self):
+        if self.cursor is None:
+            return
+        while len(self.entries) > self.cursor + 1:
+            self.entries.pop()
+        if self.entries:
+            self.last = self.state_at(len(self.entries) - 1)
+            self.tick = int(self.last[0])
+        self.cursor = None
+
+# ----------------------------------------------------------
+# ATTRACT MODE (demos gravadas)
+# ----------------------------------------------------------
+DEMO_DIR = "demos"
+DEMO_KEEP = 3
+DEMO_RECORD_EVERY = 3
+DEMO_MAX_FRAMES = 1200
+DEMO_MIN_FRAMES = 200
+ATTRACT_FPS = 20
+ATTRACT_IDLE_MS = 30000
+MENU_IDLE_TIMEOUT = 1000
+
+DEMO_P1, DEMO_P2, DEMO_METEOR, DEMO_POWERUP, DEMO_BULLET, DEMO_BOSS, DEMO_BOSS_SHOT = range(7)
+
+# Guarda so o que estava na tela a cada DEMO_RECORD_EVERY ticks (20 fps),
+# mantendo os ultimos DEMO_MAX_FRAMES quadros da partida.
+class DemoRecorder:
+    def __init__(self):
+        self.frames = deque(maxlen=DEMO_MAX_FRAMES)
+        self.ticks = 0
+
+    def capture(self, phase, players, meteors, powerups, boss):
+        self.ticks += 1
+        if self.ticks % DEMO_RECORD_EVERY:
+            return
+        sprites = []
+        for p in players:
+            if p and p.lives > 0:
+                sprites.append((DEMO_P1 if p.number == 1 else DEMO_P2, p.rect.x, p.rect.y, 0))
+                for b in p.bullets:
+                    sprites.append((DEMO_BULLET, b.rect.x, b.rect.y, 0))
+        for m in meteors:
+            if m.rect.bottom > 0:
+                sprites.append((DEMO_METEOR, m.rect.x, m.rect.y, m.kind))
+        for pu in powerups:
+            if pu.rect.bottom > 0:
+                sprites.append((DEMO_POWERUP, pu.rect.x, pu.rect.y, pu.kind))
+        if boss:
+            sprites.append((DEMO_BOSS, boss.rect.x, boss.rect.y, 0))
+            for proj in boss.projectiles:
+                sprites.append((DEMO_BOSS_SHOT, proj.rect.centerx, proj.rect.centery, 0))
+        self.frames.append((phase, sprites))
+
+    def save(self):
+        if len(self.frames) < DEMO_MIN_FRAMES:
+            return False
+        try:
+            os.makedirs(DEMO_DIR, exist_ok=True)
+        except OSError:
+            return False
+        path = os.path.join(DEMO_DIR, f"demo_{int(time.time())}.json")
+        # alguns MB de JSON: grava compacto e fora da thread do jogo
+        threading.Thread(target=self.write, args=(path, list(self.frames)), name="demo").start()
+        return True
+
+    @staticmethod
+    def write(path, frames):
+        save_json(path, {"fps": ATTRACT_FPS, "frames": frames}, compact=True)
+        for old in demo_files()[:-DEMO_KEEP]:
+            try: os.remove(old)
+            except OSError: pass
+
+def demo_files():
+    try:
+        names = sorted(n for n in os.listdir(DEMO_DIR) if n.startswith("demo_") and n.endswith(".json"))
+    except OSError:
+        return []
+    return [os.path.join(DEMO_DIR, n) for n in names]
+
+DEMO_BOSS_SPRITE = []
+
+def demo_sprite(sid, kind):
+    if sid == DEMO_P1: return PLAYER_SPRITES[1][0]
+    if sid == DEMO_P2: return PLAYER_SPRITES[2][0]
+    if sid == DEMO_METEOR: return METEOR_TYPES[kind].image
+    if sid == DEMO_POWERUP: return POWERUP_TYPES[kind].image
+    if sid == DEMO_BULLET: return IMAGES["bullet"]
+    if sid == DEMO_BOSS:
+        if not DEMO_BOSS_SPRITE:
+            raw = IMAGES.get("boss_sprite")
+            DEMO_BOSS_SPRITE.append(pygame.transform.scale(raw, (BOSS_W, BOSS_H)) if raw else None)
+        return DEMO_BOSS_SPRITE[0]
+    return None
+
+# ----------------------------------------------------------
+# EXIT/MENU
+# ----------------------------------------------------------
+# As telas de menu desenham numa superficie em cache so quando algo muda e
+# ficam bloqueadas em pygame.event.wait entre uma entrada e outra.
+REDRAW_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED, pygame.WINDOWRESTORED, pygame.WINDOWSHOWN)
+
+def wait_menu_events(timeout=MENU_IDLE_TIMEOUT):
+    ev = pygame.event.wait(timeout)
+    events = [ev] if ev.type != pygame.NOEVENT else []
+    events.extend(pygame.event.get())
+    return events
+
+def render_confirm_quit():
+    surf = pygame.Surface((WIDTH, HEIGHT))
+    surf.fill((10,10,20))
+    draw_text_center("Pressione ESC para confirmar saída, ou qualquer outra tecla para cancelar.", HEIGHT//2, size=24, surf=surf)
+    return surf
+
+def render_start_menu(credits, show_highscores, scores, endless_mode):
+    surf = pygame.Surface((WIDTH, HEIGHT))
+    surf.fill((18,18,30))
+    draw_text_center("SPACE ESCAPE", HEIGHT//4, size=64, surf=surf)
+    draw_text_center("Pressione C para inserir ficha (Insert Coin).", HEIGHT//4 + 60, size=24, surf=surf)
+    draw_text_center("Pressione ENTER para iniciar (requer 1 ficha).", HEIGHT//4 + 90, size=22, surf=surf)
+    draw_text_center("Pressione H para ver High Scores. M ativa mouse para P1. 2 ativa P2.", HEIGHT//4 + 120, size=20, surf=surf)
+    draw_text_center("Pressione L para carregar jogo salvo. Pressione Q para sair.", HEIGHT//4 + 150, size=20, surf=surf)
+    draw_text_center(f"Pressione E para o modo infinito apos o boss: {'LIGADO' if endless_mode else 'DESLIGADO'}", HEIGHT//4 + 175, size=20, surf=surf)
+
+    credit_surf = font.render(f"CREDIT(S): {credits}", True, WHITE)
+    surf.blit(credit_surf, (WIDTH//2 - 60, HEIGHT//2 + 80))
+
+    if show_highscores:
+        y = HEIGHT//2 - 20
+        draw_text_center("Top Scores:", y, size=32, surf=surf)
+        y += 40
+        for s in scores[:TOP_SCORES]:
+            line = font.render(f"{s['name']} - {s['score']}", True, WHITE)
+            surf.blit(line, (WIDTH//2 - 100, y))
+            y += 24
+    return surf
+
+def render_end_screen(win, phase_score, name):
+    surf = pygame.Surface((WIDTH, HEIGHT))
+    surf.fill((10,10,20))
+    if win:
+        draw_text_center("Você venceu! Parabéns!", HEIGHT//3, size=48, surf=surf)
+    else:
+        draw_text_center("Fim de jogo!", HEIGHT//3, size=48, surf=surf)
+    draw_text_center(f"Pontuação final: {phase_score}", HEIGHT//3 + 60, size=32, surf=surf)
+    draw_text_center("Digite seu nome e pressione ENTER para salvar no High Score:", HEIGHT//3 + 120, size=20, surf=surf)
+    name_surf = font.render(name, True, WHITE)
+    surf.blit(name_surf, (WIDTH//2 - 100, HEIGHT//3 + 160))
+    return surf
+
+def render_game_over():
+    surf = pygame.Surface((WIDTH, HEIGHT))
+    surf.fill((10,10,20))
+    draw_text_center("Jogo encerrado.", HEIGHT//2 - 40, surf=surf)
+    draw_text_center("Pressione C para voltar ao menu inicial ou Q para sair.", HEIGHT//2 + 10, surf=surf)
+    return surf
+
+# ----------------------------------------------------------
+# CENAS
+# ----------------------------------------------------------
+# Um unico loop (SceneManager.run) com uma pilha de cenas: so a do topo
+# recebe eventos e update; as de baixo ficam congeladas. Cenas "idle"
+# (menus) esperam eventos bloqueadas; as outras andam no ritmo do FrameGovernor.
+class Scene:
+    idle = False           # espera eventos em vez de rodar a FPS
+    overlay = False        # desenha por cima da cena de baixo
+    pauses_music = False   # musica pausada enquanto esta no topo
+    mouse_control = False
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.dirty = True
+
+    def enter(self): pass
+    def exit(self): pass
+    def suspend(self): pass
+    def resume(self): self.dirty = True
+    def handle(self, event): pass
+    def update(self, dt): pass
+    def draw(self, surf): pass
+    def frame_skipped(self): pass
+    def frame_presented(self): pass
+    # cenas idle: quanto esperar por eventos antes do proximo update
+    def wait_timeout(self): return MENU_IDLE_TIMEOUT
+
+class SceneManager:
+    def __init__(self):
+        self.stack = []
+        self.pacer = FrameGovernor()
+        self.running = True
+        self.music_paused = False
+
+    def push(self, scene):
+        if self.stack:
+            self.stack[-1].suspend()
+        self.stack.append(scene)
+        scene.enter()
+        self.sync_music()
+
+    def pop(self):
+        scene = self.stack.pop()
+        scene.exit()
+        if self.stack:
+            self.stack[-1].resume()
+        self.sync_music()
+        return scene
+
+    # Troca a pilha inteira (ex.: fim de jogo -> tela final -> menu)
+    def reset(self, scene):
+        while self.stack:
+            self.stack.pop().exit()
+        self.push(scene)
+
+    def quit(self):
+        self.running = False
+
+    def sync_music(self):
+        pause = bool(self.stack) and self.stack[-1].pauses_music
+        if pause == self.music_paused:
+            return
+        self.music_paused = pause
+        try:
+            if pause:
+                pygame.mixer.music.pause()
+            else:
+                pygame.mixer.music.unpause()
+        except:
+            pass
+
+    def visible_scenes(self):
+        i = len(self.stack) - 1
+        while i > 0 and self.stack[i].overlay:
+            i -= 1
+        return self.stack[i:]
+
+    def run(self):
+        while self.running and self.stack:
+            scene = self.stack[-1]
+            if scene.idle:
+                events = wait_menu_events(scene.wait_timeout())
+                dt = 0
+            else:
+                dt = self.pacer.tick()
+                events = pygame.event.get()
+            if alloc_tracker and not scene.idle:
+                alloc_tracker.stage("eventos")
+            # so a cena de jogo apresenta todo tick; nas idle uma entrada que nao
+            # redesenha ficaria pendente ate a proxima tela e viraria uma amostra falsa
+            if latency_probe and not scene.idle:
+                latency_probe.poll()
+                latency_probe.record_events(events, scene.mouse_control)
+            for event in events:
+                if not self.stack:
+                    break
+                top = self.stack[-1]
+                if event.type in REDRAW_EVENTS:
+                    top.dirty = True
+                elif event.type == pygame.QUIT and not isinstance(top, ConfirmQuitScene):
+                    self.push(ConfirmQuitScene(self))
+                else:
+                    top.handle(event)
+            if not self.running or not self.stack:
+                break
+            scene = self.stack[-1]
+            if alloc_tracker and not scene.idle:
+                alloc_tracker.stage("update")
+            scene.update(dt)
+            if not self.running or not self.stack or self.stack[-1] is not scene:
+                continue
+
+            if scene.idle:
+                visible = self.visible_scenes()
+                if any(s.dirty for s in visible):
+                    for s in visible:
+                        s.draw(screen)
+                        s.dirty = False
+                    present_frame()
+                elif latency_probe:
+                    latency_probe.discard_pending()
+                continue
+
+            self.pacer.update_done()
+            if not self.pacer.should_render():
+                scene.frame_skipped()
+                if alloc_tracker:
+                    alloc_tracker.frame_done()
+                continue
+            if alloc_tracker:
+                alloc_tracker.stage("desenho")
+            for s in self.visible_scenes():
+                s.draw(screen)
+                s.dirty = False
+            self.pacer.draw_done()
+            if alloc_tracker:
+                alloc_tracker.stage("apresentar")
+            if replay:
+                replay.capture(screen)
+            present_frame()
+            self.pacer.render_done()
+            scene.frame_presented()
+            if alloc_tracker:
+                alloc_tracker.frame_done()
+
+# ----------------------------------------------------------
+# CENAS: MENU, ATTRACT, CONFIRMACAO, PAUSA, CONTAGEM, FIM
+# ----------------------------------------------------------
+class MenuScene(Scene):
+    idle = True
+
+    def __init__(self, manager, credits=0):
+        super().__init__(manager)
+        self.credits = credits
+        self.show_highscores = False
+        self.enable_player2 = False
+        self.mouse_control = False
+        self.endless_mode = False
+        self.scores = load_highscores()
+        self.cached = None
+        self.last_input = pygame.time.get_ticks()
+
+    def enter(self):
+        play_intro_music()
+
+    def resume(self):
+        super().resume()
+        self.cached = None
+        self.last_input = pygame.time.get_ticks()
+
+    def insert_credit(self):
+        self.credits += 1
+        telemetry.emit("credit_inserted", credits=self.credits)
+
+    def start_game(self, load):
+        stop_music()
+        args = {"player2": self.enable_player2, "mouse": self.mouse_control, "credits": self.credits, "endless": self.endless_mode}
+        self.manager.reset(PlayScene(self.manager, args, load=load))
+
+    def handle(self, event):
+        self.last_input = pygame.time.get_ticks()
+        if event.type != pygame.KEYDOWN:
+            return
+        self.cached = None
+        self.dirty = True
+        if event.key == pygame.K_c:
+            self.insert_credit()
+        if event.key == pygame.K_h:
+            self.show_highscores = not self.show_highscores
+        if event.key == pygame.K_2:
+            self.enable_player2 = not self.enable_player2
+        if event.key == pygame.K_m:
+            self.mouse_control = not self.mouse_control
+        if event.key == pygame.K_e:
+            self.endless_mode = not self.endless_mode
+        if event.key == pygame.K_l:
+            self.start_game(load=True)
+        if event.key == pygame.K_q:
+            self.manager.push(ConfirmQuitScene(self.manager))
+        if event.key == pygame.K_RETURN:
+            if self.credits >= 1:
+                self.credits -= 1
+                self.start_game(load=False)
+            else:
+                try:
+                    if SOUNDS.get("hit"):
+                        SOUNDS["hit"].play()
+                except:
+                    pass
+
+    def update(self, dt):
+        if pygame.time.get_ticks() - self.last_input < ATTRACT_IDLE_MS:
+            return
+        demos = demo_files()
+        if demos:
+            self.manager.push(AttractScene(self.manager, random.choice(demos), self))
+        else:
+            self.last_input = pygame.time.get_ticks()
+
+    def draw(self, surf):
+        if self.cached is None:
+            self.cached = render_start_menu(self.credits, self.show_highscores, self.scores, self.endless_mode)
+        surf.blit(self.cached, (0,0))
+
+# Toca uma demo gravada no ritmo dela; qualquer tecla volta ao menu. E idle:
+# dorme ate o proximo quadro da demo e so redesenha quando o indice muda
+class AttractScene(Scene):
+    idle = True
+
+    def __init__(self, manager, path, menu):
+        super().__init__(manager)
+        demo = load_json(path) or {}
+        self.frames = demo.get("frames") or []
+        self.fps = demo.get("fps", ATTRACT_FPS)
+        self.menu = menu
+        self.started = pygame.time.get_ticks()
+        self.index = 0
+        self.banner = get_font(28).render("DEMO - pressione qualquer tecla", True, YELLOW)
+        self.banner_rect = self.banner.get_rect(center=(WIDTH//2, HEIGHT - 40))
+
+    def handle(self, event):
+        if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+            self.manager.pop()
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                self.menu.insert_credit()
+
+    def wait_timeout(self):
+        next_frame = self.started + (self.index + 1) * 1000.0 / self.fps
+        return max(1, int(next_frame - pygame.time.get_ticks()))
+
+    def update(self, dt):
+        index = int((pygame.time.get_ticks() - self.started) * self.fps / 1000.0)
+        if index >= len(self.frames):
+            self.manager.pop()
+        elif index != self.index:
+            self.index = index
+            self.dirty = True
+
+    def draw(self, surf):
+        phase, sprites = self.frames[self.index]
+        draw_background(surf, PHASE_BACKGROUNDS.get(phase))
+        for sid, x, y, kind in sprites:
+            img = demo_sprite(sid, kind)
+            if img:
+                surf.blit(img, (x, y))
+            elif sid == DEMO_BOSS_SHOT:
+                pygame.draw.circle(surf, (255,80,80), (x, y), 9)
+        surf.blit(self.banner, self.banner_rect)
+
+class ConfirmQuitScene(Scene):
+    idle = True
+    pauses_music = True
+
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.cached = render_confirm_quit()
+
+    def handle(self, event):
+        if event.type == pygame.QUIT:
+            self.manager.pop()
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                telemetry.emit("quit")
+                self.manager.quit()
+            else:
+                self.manager.pop()
+
+    def draw(self, surf):
+        surf.blit(self.cached, (0,0))
+
+class PauseScene(Scene):
+    idle = True
+    overlay = True
+    pauses_music = True
+
+    def __init__(self, manager, play):
+        super().__init__(manager)
+        self.play = play
+
+    def handle(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_p:
+            self.manager.pop()
+        elif event.key == pygame.K_ESCAPE:
+            self.manager.push(ConfirmQuitScene(self.manager))
+
+    def draw(self, surf):
+        draw_text_center("PAUSADO - pressione P para continuar", HEIGHT//2, surf=surf)
+
+# "Prontos? 3-2-1" antes de cada fase; o jogo fica congelado por baixo
+class CountdownScene(Scene):
+    def __init__(self, manager, play):
+        super().__init__(manager)
+        self.play = play
+        self.elapsed = 0.0
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+            self.manager.push(ConfirmQuitScene(self.manager))
+
+    def update(self, dt):
+        self.elapsed += dt
+        self.play.particles.update(game_clock.now() + int(self.elapsed))
+        if self.elapsed >= PHASE_START_DELAY:
+            self.manager.pop()
+
+    def draw(self, surf):
+        surf.fill((10,10,30))
+        self.play.particles.draw(surf, game_clock.now() + int(self.elapsed))
+        sleft = int(math.ceil(max(0, PHASE_START_DELAY - self.elapsed) / 1000.0))
+        draw_text_center(f"Prontos? {sleft}", HEIGHT//2, size=64, surf=surf)
+
+# Deixa a explosao final do boss terminar antes da tela de fim
+class OutroScene(Scene):
+    def __init__(self, manager, play, win, score):
+        super().__init__(manager)
+        self.play = play
+        self.win = win
+        self.score = score
+        self.elapsed = 0.0
+
+    def update(self, dt):
+        self.elapsed += dt
+        now = game_clock.now() + int(self.elapsed)
+        self.play.particles.update(now)
+        if self.elapsed >= BOSS_DEATH_MS or not self.play.particles.live:
+            self.manager.reset(GameOverScene(self.manager, self.win, self.score, self.play.credits_remaining))
+
+    def draw(self, surf):
+        draw_background(surf, PHASE_BACKGROUNDS.get(self.play.phase))
+        for p in self.play.players:
+            if p:
+                p.draw(surf)
+        self.play.particles.draw(surf, game_clock.now() + int(self.elapsed))
+
+# Nome para o high score e depois "C volta ao menu / Q sai"
+class GameOverScene(Scene):
+    idle = True
+
+    def __init__(self, manager, win, score, credits=0):
+        super().__init__(manager)
+        self.win = win
+        self.score = score
+        self.credits = credits
+        self.name = ""
+        self.entering = True
+        self.cached = None
+
+    def enter(self):
+        try:
+            pygame.mixer.music.stop()
+        except:
+            pass
+
+    def resume(self):
+        super().resume()
+        self.cached = None
+
+    def handle(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        self.cached = None
+        self.dirty = True
+        if self.entering:
+            if event.key == pygame.K_RETURN:
+                if self.name.strip() == "":
+                    self.name = "ANÔNIMO"
+                add_highscore(self.name, self.score)
+                self.entering = False
+            elif event.key == pygame.K_BACKSPACE:
+                self.name = self.name[:-1]
+            else:
+                if len(self.name) < 16 and event.unicode.isprintable():
+                    self.name += event.unicode
+        else:
+            if event.key == pygame.K_c:
+                self.manager.reset(MenuScene(self.manager, self.credits))
+            if event.key == pygame.K_q:
+                self.manager.push(ConfirmQuitScene(self.manager))
+
+    def draw(self, surf):
+        if self.cached is None:
+            self.cached = render_end_screen(self.win, self.score, self.name) if self.entering else render_game_over()
+        surf.blit(self.cached, (0,0))
+
+# ----------------------------------------------------------
+# CENA DE JOGO
+# ----------------------------------------------------------
+class PlayScene(Scene):
+    def __init__(self, manager, start_args, load=False):
+        super().__init__(manager)
+        self.start_args = start_args
+        self.load = load
+        self.phase = 1
+        self.phase_score = 0
+        self.meteors = []
+        self.powerups = []
+        self.director = make_director(self.phase)
+        self.boss = None
+        self.players = [None, None]
+        self.players[0] = Player(1, WIDTH//2, HEIGHT-80)
+        if start_args.get("player2"):
+            self.players[1] = Player(2, WIDTH//2 - 120, HEIGHT-80)
+        self.mouse_control = start_args.get("mouse", False)
+        self.player2_active = bool(start_args.get("player2", False))
+        self.phase_start_time = game_clock.now()
+        self.credits_remaining = start_args.get("credits", 0)
+        self.endless = bool(start_args.get("endless", False))
+        self.quality = QualityGovernor()
+        self.stats = ThroughputStats()
+        self.frame_no = 0
+        self.precise = PRECISE_COLLISION
+        self.recorder = DemoRecorder()
+        self.particles = ParticleSystem()
+        self.render_queue = RenderQueue()
+        self.hud = HudLayer()
+        self.rewind = RewindBuffer(REWIND_SECONDS) if REWIND_SECONDS > 0 else None
+        self.rewinding = False
+        self.shots_fired = 0
+        self.shots_hit = 0
+        self.frame_samples = []
+        self.last_frame_summary = self.phase_start_time
+        self.skips_at_summary = 0
+        telemetry.emit("game_start", player2=self.player2_active, mouse=self.mouse_control, endless=self.endless, credits=self.credits_remaining)
+        telemetry.emit("phase_start", phase=self.phase)
+
+    def enter(self):
+        stop_music()
+        play_music_for_phase(self.phase)
+        if not (self.load and self.load_save()):
+            self.manager.push(CountdownScene(self.manager, self))
+
+    def exit(self):
+        if game_metrics:
+            game_metrics.leave_play()
+
+    def start_phase(self, phase):
+        self.phase = phase
+        self.phase_start_time = game_clock.now()
+        self.shots_fired = self.shots_hit = 0
+        telemetry.emit("phase_start", phase=self.phase)
+        self.meteors = []
+        self.powerups = []
+        self.director = make_director(self.phase)
+        play_music_for_phase(self.phase)
+        self.manager.push(CountdownScene(self.manager, self))
+
+    def load_save(self):
+        s = load_json(SAVE_FILE)
+        if not s:
+            return False
+        self.phase, self.phase_score, restored_players, self.meteors, self.powerups, self.boss, pst, self.player2_active, self.mouse_control = restore_save_state(s)
+        self.director = make_director(self.phase, live_meteors=len(self.meteors))
+        if restored_players[0]: self.players[0] = restored_players[0]
+        if len(restored_players) > 1 and restored_players[1]: self.players[1] = restored_players[1]
+        self.phase_start_time = game_clock.now()
+        telemetry.emit("game_loaded", phase=self.phase)
+        play_music_for_phase(self.phase)
+        self.manager.push(CountdownScene(self.manager, self))
+        return True
+
+    # o mesmo caminho para clique, SPACE e CTRL
+    def fire(self, p):
+        self.shots_fired += p.weapon.fire(p, game_clock.now())
+
+    def handle(self, event):
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_p:
+                self.manager.push(PauseScene(self.manager, self))
+            if event.key == pygame.K_F1:
+                state = make_save_state(self.phase, self.phase_score, self.players, self.meteors, self.powerups, self.boss, self.phase_start_time, self.player2_active, self.mouse_control)
+                save_json(SAVE_FILE, state)
+            if event.key == pygame.K_F2:
+                self.load_save()
+            if event.key == pygame.K_2:
+                if not self.players[1]:
+                    self.players[1] = Player(2, WIDTH//2 - 120, HEIGHT-80)
+                    self.player2_active = True
+            if event.key == pygame.K_m:
+                self.mouse_control = not self.mouse_control
+            if event.key == pygame.K_F4:
+                self.precise = not self.precise
+                print("Colisao precisa:", "ligada" if self.precise else "desligada")
+            if event.key == pygame.K_F3 and latency_probe:
+                print(latency_probe.report())
+            if event.key == pygame.K_F5 and replay:
+                replay.save()
+            if event.key == pygame.K_ESCAPE:
+                self.manager.push(ConfirmQuitScene(self.manager))
+
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1 and self.mouse_control and self.players[0]:
+                self.fire(self.players[0])
+
+    # colisoes de um meteoro na tela; True se ele deve sair da lista
+    def collide_meteor(self, m, now):
+        mask = METEOR_TYPES[m.kind].mask
+        for p in self.players:
+            if p and m.rect.colliderect(p.rect) and (not self.precise or masks_overlap(m.rect, mask, p.rect, p.mask)):
+                if p.take_damage():
+                    self.particles.explode(m.rect, now)
+                    self.particles.explode(p.rect, now, 60)
+                    return True
+
+        for p in self.players:
+            if p:
+                # sai do laco logo apos o remove, entao nao precisa copiar a lista
+                for b in p.bullets:
+                    if m.rect.colliderect(b.rect) and (not self.precise or masks_overlap(m.rect, mask, b.rect, Projectile.mask)):
+                        if SOUNDS.get("point"):
+                            try: SOUNDS["point"].play()
+                            except: pass
+                        p.bullets.remove(b)
+                        self.phase_score += 2
+                        self.shots_hit += 1
+                        self.particles.explode(m.rect, now)
+                        return True
+        return False
+
+    def collect_powerup(self, pu):
+        for p in self.players:
+            if p and pu.rect.colliderect(p.rect) and (not self.precise or masks_overlap(pu.rect, POWERUP_TYPES[pu.kind].mask, p.rect, p.mask)):
+                POWERUP_EFFECTS[pu.kind](p)
+                telemetry.emit("powerup", type=POWERUP_TYPES[pu.kind].name, player=p.number, phase=self.phase)
+                sound = SOUNDS.get(POWERUP_TYPES[pu.kind].sound)
+                if sound: sound.play()
+                self.director.on_powerup_pickup(len(self.meteors))
+                return True
+        return False
+
+    def update(self, dt):
+        game_clock.advance(dt)
+        now = game_clock.now()
+        self.frame_no += 1
+
+        if asset_watcher:
+            changed = asset_watcher.take_changes()
+            if changed:
+                image_keys, tuning_changed = apply_hot_reload(changed)
+                for p in self.players:
+                    if p and ("player1" in image_keys or "player2" in image_keys or "bullet" in image_keys):
+                        p.refresh_sprite()
+                    if p and tuning_changed:
+                        p.max_bullets = BULLET_LIMIT
+                        p.weapon.cooldown = SHOT_COOLDOWN
+                if self.boss and ("boss_sprite" in image_keys or "boss_engine" in image_keys):
+                    self.boss.load_sprites()
+                if tuning_changed:
+                    self.director.retune(len(self.meteors))
+                if self.boss and tuning_changed:
+                    self.boss.shoot_delay = BOSS_SHOOT_DELAY
+
+        keys = pygame.key.get_pressed()
+
+        self.rewinding = False
+        if self.rewind:
+            if keys[pygame.K_r]:
+                self.rewinding = True
+                restored = self.rewind.step_back(now, self.players, self.boss)
+                if restored:
+                    _, rewound_phase, self.phase_score, self.phase_start_time, self.shots_fired, self.shots_hit, self.meteors, self.powerups, self.boss, self.director = restored
+                    if rewound_phase != self.phase:
+                        self.phase = rewound_phase
+                        play_music_for_phase(self.phase)
+                return
+            self.rewind.resume()
+            self.rewind.seed_tick()
+
+        #PLAYER 1
+        if alloc_tracker:
+            alloc_tracker.stage("jogadores")
+        p1 = self.players[0]
+        if p1:
+            if self.mouse_control:
+                mx, my = pygame.mouse.get_pos()
+                p1.rect.centerx = clamp(mx, p1.rect.width//2, WIDTH - p1.rect.width//2)
+                p1.rect.centery = clamp(my, p1.rect.height//2, HEIGHT - p1.rect.height//2)
+                if pygame.mouse.get_pressed()[0]:
+                    self.fire(p1)
+            else:
+                if keys[pygame.K_LEFT] and p1.rect.left > 0:
+                    p1.rect.x -= p1.speed
+                if keys[pygame.K_RIGHT] and p1.rect.right < WIDTH:
+                    p1.rect.x += p1.speed
+                if keys[pygame.K_UP] and p1.rect.top > 0:
+                    p1.rect.y -= p1.speed
+                if keys[pygame.K_DOWN] and p1.rect.bottom < HEIGHT:
+                    p1.rect.y += p1.speed
+                if keys[pygame.K_SPACE]:
+                    self.fire(p1)
+
+        #PLAYER 2
+        p2 = self.players[1]
+        if p2:
+            if keys[pygame.K_a] and p2.rect.left > 0: p2.rect.x -= p2.speed
+            if keys[pygame.K_d] and p2.rect.right < WIDTH: p2.rect.x += p2.speed
+            if keys[pygame.K_w] and p2.rect.top > 0: p2.rect.y -= p2.speed
+            if keys[pygame.K_s] and p2.rect.bottom < HEIGHT: p2.rect.y += p2.speed
+            if keys[pygame.K_LCTRL] or keys[pygame.K_RCTRL]:
+                self.fire(p2)
+
+        # listas compactadas no lugar: sem copia por frame e sem remove() O(n)
+        for p in self.players:
+            if p:
+                bullets = p.bullets
+                keep = 0
+                for b in bullets:
+                    b.update()
+                    if not (b.rect.bottom < 0 or b.rect.top > HEIGHT or b.rect.left > WIDTH or b.rect.right < 0):
+                        bullets[keep] = b
+                        keep += 1
+                del bullets[keep:]
+
+        #SPAWNS
+        if alloc_tracker:
+            alloc_tracker.stage("spawns")
+        self.director.update(dt, self.meteors, self.powerups)
+
+        #METEOROS
+        if alloc_tracker:
+            alloc_tracker.stage("meteoros")
+        lod_interval = self.quality.lod_interval()
+        meteors = self.meteors
+        live = len(meteors)
+        keep = 0
+        for m in meteors:
+            removed = False
+            if m.rect.bottom < -LOD_FAR_MARGIN:
+                # longe da tela: nada colide aqui, atualiza a cada N frames com passo N
+                if (self.frame_no + m.rect.x) % lod_interval == 0:
+                    m.update(lod_interval)
+                    self.stats.updated += 1
+                else:
+                    self.stats.lod_skipped += 1
+            else:
+                m.update()
+                self.stats.updated += 1
+                if m.rect.bottom >= 0:
+                    removed = m.rect.top > HEIGHT or self.collide_meteor(m, now)
+
+            if removed:
+                live -= 1
+                self.director.on_meteor_removed(live)
+            else:
+                meteors[keep] = m
+                keep += 1
+        del meteors[keep:]
+
+        #POWERUPS
+        if alloc_tracker:
+            alloc_tracker.stage("powerups")
+        powerups = self.powerups
+        keep = 0
+        for pu in powerups:
+            removed = False
+            if pu.rect.bottom < -LOD_FAR_MARGIN:
+                if (self.frame_no + pu.rect.x) % lod_interval == 0:
+                    pu.update(lod_interval)
+            else:
+                pu.update()
+                if pu.rect.bottom >= 0:
+                    removed = pu.rect.top > HEIGHT or self.collect_powerup(pu)
+            if not removed:
+                powerups[keep] = pu
+                keep += 1
+        del powerups[keep:]
+
+        #BOSS
+        if alloc_tracker:
+            alloc_tracker.stage("boss")
+        if self.phase == 5:
+            if self.boss is not None:
+                self.meteors.clear()
+                self.powerups.clear()
+            if not self.boss:
+                self.boss = Boss(WIDTH//2, HEIGHT//3)
+            if self.boss.engine_anim:
+                self.boss.engine_anim.slowdown = self.quality.engine_slowdown()
+            self.boss.update(self.players)
+
+            # de tras para frente: del nao desloca o que ainda falta visitar
+            projectiles = self.boss.projectiles
+            for i in range(len(projectiles) - 1, -1, -1):
+                proj = projectiles[i]
+                for p in self.players:
+                    if p and proj.rect.colliderect(p.rect) and (not self.precise or masks_overlap(p.rect, p.mask, proj.rect, Projectile.mask)):
+                        if p.take_damage("tiro_boss"):
+                            self.particles.explode(p.rect, now, 60)
+                            if SOUNDS.get("hit"): SOUNDS["hit"].play()
+                        if i < len(projectiles) and projectiles[i] is proj:
+                            del projectiles[i]
+
+            for p in self.players:
+                if p:
+                    bullets = p.bullets
+                    for i in range(len(bullets) - 1, -1, -1):
+                        b = bullets[i]
+                        part = self.boss.part_hit(b.rect, self.precise)
+                        if part:
+                            self.particles.emit("spark", b.rect.centerx, b.rect.top, 12, now)
+                            if self.boss.take_damage_to_part(part, 10):
+                                telemetry.emit("boss_part_killed", part=part)
+                                self.particles.emit("explosion", b.rect.centerx, b.rect.top, 300, now)
+                            self.phase_score += 10
+                            self.shots_hit += 1
+                            del bullets[i]
+
+            if self.boss.is_defeated():
+                emit_phase_end(self.phase, self.phase_start_time, self.phase_score, self.shots_fired, self.shots_hit, "boss_derrotado")
+                self.particles.boss_death(self.boss.rect, now)
+                if not self.endless:
+                    self.recorder.save()
+                    score = self.phase_score + sum([p.lives * 5 for p in self.players if p])
+                    self.manager.push(OutroScene(self.manager, self, True, score))
+                    return
+                # modo infinito: segue sem boss com dificuldade crescente
+                self.boss = None
+                self.start_phase(ENDLESS_PHASE)
+                return
+
+        #INCREMENTO FASES
+        if self.phase < 5:
+            if self.phase_score >= PHASE_TARGETS[self.phase]:
+                emit_phase_end(self.phase, self.phase_start_time, self.phase_score, self.shots_fired, self.shots_hit, "meta")
+                self.phase_score = 0
+                self.start_phase(self.phase + 1)
+                return
+
+        alive = False
+        for p in self.players:
+            if p and p.lives > 0:
+                alive = True
+        if not alive:
+            self.stats.flush(pygame.time.get_ticks())
+            emit_phase_end(self.phase, self.phase_start_time, self.phase_score, self.shots_fired, self.shots_hit, "game_over")
+            self.recorder.save()
+            self.manager.reset(GameOverScene(self.manager, False, self.phase_score, self.credits_remaining))
+            return
+
+        if alloc_tracker:
+            alloc_tracker.stage("particulas")
+        self.particles.set_fraction(self.quality.particle_fraction())
+        for p in self.players:
+            if p and p.lives > 0:
+                self.particles.emit("trail", p.rect.centerx, p.rect.bottom - 6, 2, now, vy=0.12)
+        self.particles.update(now)
+
+        if alloc_tracker:
+            alloc_tracker.stage("captura")
+        if self.rewind:
+            self.rewind.capture(now, self.phase, self.phase_score, self.phase_start_time, self.shots_fired, self.shots_hit, self.players, self.meteors, self.powerups, self.boss, self.director)
+        self.recorder.capture(self.phase, self.players, self.meteors, self.powerups, self.boss)
+
+    def draw(self, surf):
+        bg_key = PHASE_BACKGROUNDS.get(self.phase)
+        draw_background(surf, bg_key, self.quality.flat_background())
+
+        # so entra na fila o que esta dentro da tela
+        now = game_clock.now()
+        drawn = submit_world(self.render_queue, self.meteors, self.powerups, self.players, self.boss, self.particles, now)
+        self.stats.drawn += drawn
+        self.stats.culled += len(self.meteors) + len(self.powerups) - drawn
+        target_label = PHASE_TARGETS.get(self.phase, None) or ("BOSS" if self.phase == 5 else f"NIVEL {self.director.level}")
+        self.hud.submit(self.render_queue, self.players, self.phase_score, self.phase, target_label, self.start_args.get("credits", 0))
+        self.render_queue.flush(surf)
+        if self.boss: self.boss.draw_hp_bar(surf)
+        if SHOW_PERF_HUD:
+            draw_perf_hud(self.manager.pacer, self.quality)
+        if self.rewinding:
+            seconds_back = (len(self.rewind.entries) - 1 - (self.rewind.cursor or 0)) / FPS
+            draw_text_center(f"<< REWIND -{seconds_back:.1f}s", HEIGHT//2, size=48, color=YELLOW, surf=surf)
+
+    def frame_skipped(self):
+        self.stats.skipped += 1
+
+    def frame_presented(self):
+        now = game_clock.now()
+        if game_metrics:
+            game_metrics.phase = self.phase
+            game_metrics.meteors = len(self.meteors)
+            game_metrics.powerups = len(self.powerups)
+            game_metrics.bullets = sum(len(p.bullets) for p in self.players if p)
+            game_metrics.boss_projectiles = len(self.boss.projectiles) if self.boss else 0
+            game_metrics.frames_skipped = self.manager.pacer.skipped_total
+            game_metrics.quality_tier = self.quality.tier
+            if self.frame_no % METRICS_MIXER_SAMPLE == 0:
+                game_metrics.sample_mixer()
+        # com vsync o flip bloqueia ate o retraço; so o trabalho de CPU conta
+        self.quality.update(self.manager.pacer.cpu_ms if VSYNC else self.manager.pacer.work_ms)
+        if telemetry.enabled:
+            self.frame_samples.append(self.manager.pacer.work_ms)
+            if now - self.last_frame_summary >= TELEMETRY_FRAME_SUMMARY:
+                telemetry.emit("frame_summary", phase=self.phase, skipped=self.manager.pacer.skipped_total - self.skips_at_summary,
+                               quality=self.quality.tier, entities=len(self.meteors) + len(self.powerups),
+                               emit_us=round(telemetry.emit_cost_us(), 3), dropped=telemetry.dropped,
+                               **summarize_frames(self.frame_samples))
+                self.frame_samples.clear()
+                self.last_frame_summary = now
+                self.skips_at_summary = self.manager.pacer.skipped_total
+        self.stats.end_frame(pygame.time.get_ticks(), self.manager.pacer.work_ms, len(self.meteors) + len(self.powerups))
+
+# ----------------------------------------------------------
+# BENCHMARK DE MEMORIA (python SpaceEscape.py --bench-memory)
+# ----------------------------------------------------------
+BENCH_FACTORIES = {
+    "Meteor": lambda i: Meteor(i % WIDTH, -40 - i % 500, 3 + i % 8),
+    "Powerup": lambda i: Powerup(i % WIDTH, -40 - i % 500, i % len(POWERUP_TYPES)),
+    "Projectile": lambda i: Projectile(i % WIDTH, HEIGHT - i % 500, 0, -12, 1),
+}
+
+# populacao tipica do modo infinito: quase tudo meteoro
+BENCH_MIX = (("Meteor", 0.85), ("Powerup", 0.05), ("Projectile", 0.10))
+
+def traced_build(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = build()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return items, used
+
+def run_memory_benchmark(counts=(1000, 10000, 100000)):
+    print(f"{'entidades':>10} {'classe':>11} {'bytes/entidade':>15} {'total KiB':>10}")
+    for n in counts:
+        for name, factory in BENCH_FACTORIES.items():
+            items, used = traced_build(lambda: [factory(i) for i in range(n)])
+            # desconta a lista que segura as entidades
+            per = (used - sys.getsizeof(items)) / n
+            print(f"{n:>10} {name:>11} {per:>15.1f} {used / 1024:>10.1f}")
+            del items
+    print()
+    print(f"{'entidades':>10} {'heap mix KiB':>13} {'RSS MiB':>9}")
+    for n in counts:
+        def build():
+            lst = []
+            for name, share in BENCH_MIX:
+                factory = BENCH_FACTORIES[name]
+                lst.extend(factory(i) for i in range(int(n * share)))
+            return lst
+        items, used = traced_build(build)
+        rss = current_rss_bytes()
+        rss_text = f"{rss / 2**20:>9.1f}" if rss else f"{'?':>9}"
+        print(f"{n:>10} {used / 1024:>13.1f} {rss_text}")
+        del items
+
+# ----------------------------------------------------------
+# CHECAGEM DO SPAWN (python SpaceEscape.py --check-spawns)
+# ----------------------------------------------------------
+# Roda o director de cada fase sem jogador (os meteoros so caem e saem da
+# tela) e confere que a media de meteoros vivos fica perto do sustain
+SPAWN_CHECK_MS = 45000
+SPAWN_CHECK_MIN_RATIO = 0.75
+
+def check_spawns(phases=(1, 2, 3, 4)):
+    dt = 1000.0 / FPS
+    ok = True
+    print(f"{'fase':>4} {'sustain':>8} {'min':>5} {'media':>7} {'max':>5}")
+    for phase in phases:
+        director = make_director(phase)
+        meteors, powerups = [], []
+        settle = director.script.get("opening", (0, 0))[1] + director.script.get("respawn", (0, 0))[1]
+        samples = []
+        t = 0.0
+        while t < SPAWN_CHECK_MS:
+            director.update(dt, meteors, powerups)
+            keep = 0
+            live = len(meteors)
+            for m in meteors:
+                m.update()
+                if m.rect.top > HEIGHT:
+                    live -= 1
+                    director.on_meteor_removed(live)
+                else:
+                    meteors[keep] = m
+                    keep += 1
+            del meteors[keep:]
+            del powerups[:]
+            t += dt
+            if t >= settle:
+                samples.append(len(meteors))
+        avg = sum(samples) / len(samples)
+        print(f"{phase:>4} {director.sustain:>8} {min(samples):>5} {avg:>7.1f} {max(samples):>5}")
+        if avg < director.sustain * SPAWN_CHECK_MIN_RATIO:
+            print(f"  fase {phase}: media abaixo de {SPAWN_CHECK_MIN_RATIO:.0%} do sustain")
+            ok = False
+    return ok
+
+# ----------------------------------------------------------
+# MAIN
+# ----------------------------------------------------------
+def main():
+    manager = SceneManager()
+    try:
+        manager.push(MenuScene(manager))
+        tune_gc()
+        manager.run()
+    except SystemExit:
+        pass
+    except Exception as e:
+        print("Erro no jogo:", e)
+        if replay and replay.save():
+            replay.wait()
+    pygame.quit()
+
+if __name__ == "__main__":
+    if "--bench-memory" in sys.argv:
+        run_memory_benchmark()
+    elif "--check-spawns" in sys.argv:
+        sys.exit(0 if check_spawns() else 1)
+    else:
+        main()